@@ -0,0 +1,163 @@
+import heapq
+import itertools
+import math
+import time
+from PySide6.QtCore import Qt, QObject, QTimer, Signal
+from PySide6.QtWidgets import QApplication
+from config_manager import changed_keys
+from timer_core import MAIN_TIMER
+
+# How an alarm is announced
+ALERTS = ('flash', 'sound', 'both')
+
+# Parse '5:00', '1:02:03' or '90' into seconds
+def parse_duration(text):
+    seconds = 0.0
+    for part in str(text).strip().split(':'):
+        seconds = seconds * 60 + float(part)
+    if seconds < 0:
+        raise ValueError(f"negative duration {text!r}")
+    return seconds
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+class AlarmScheduler(QObject):
+    # Deadlines in a min-heap with one precise single-shot QTimer armed for the earliest.
+    # Adding is O(log n); cancelling marks the entry and leaves it for the heap to discard,
+    # compacting once cancelled entries make up half of the heap.
+    def __init__(self, parent=None, clock=time.monotonic):
+        super().__init__(parent)
+        self.clock = clock
+        self.heap = []
+        self.counter = itertools.count()
+        self.cancelled = 0
+        self.wakeups = 0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.fire_due)
+
+    # Call callback() once the clock reaches due; returns the entry to pass to cancel()
+    def add(self, due, callback):
+        entry = [due, next(self.counter), callback]
+        heapq.heappush(self.heap, entry)
+        if self.heap[0] is entry:
+            self.arm()
+        return entry
+
+    def cancel(self, entry):
+        self.cancel_all((entry,))
+
+    def cancel_all(self, entries):
+        for entry in entries:
+            if entry[2] is not None:
+                entry[2] = None
+                self.cancelled += 1
+        if self.cancelled * 2 > len(self.heap):
+            self.heap = [item for item in self.heap if item[2] is not None]
+            heapq.heapify(self.heap)
+            self.cancelled = 0
+        self.arm()
+
+    def fire_due(self):
+        self.wakeups += 1
+        now = self.clock()
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            callback = entry[2]
+            if callback is None:
+                self.cancelled -= 1
+                continue
+            entry[2] = None
+            callback()
+        self.arm()
+
+    # Drop cancelled entries from the top and arm the timer for the earliest live one
+    def arm(self):
+        while self.heap and self.heap[0][2] is None:
+            heapq.heappop(self.heap)
+            self.cancelled -= 1
+        if not self.heap:
+            self.timer.stop()
+            return
+        self.timer.start(max(0, math.ceil((self.heap[0][0] - self.clock()) * 1000)))
+
+    def __len__(self):
+        return len(self.heap) - self.cancelled
+
+class Alarms(QObject):
+    # Emitted when an alarm goes off: alarm name, timer name and alert
+    alarm_fired = Signal(str, str, str)
+
+    # Config keys the alarms depend on
+    CONFIG_KEYS = {'alarms'}
+
+    # Alarms at elapsed times of the pool's timers, from config['alarms']. They are scheduled
+    # when their timer starts or resets and cancelled when it stops, so nothing is polled per tick.
+    def __init__(self, pool, config, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.scheduler = AlarmScheduler(self, pool.scheduler.clock)
+        self.config = dict(config)
+        self.definitions = {}
+        # Pending heap entries per timer, by sequence number
+        self.entries = {}
+        pool.timer_event.connect(self.on_timer_event)
+        self.load_alarms()
+
+    def update_config(self, new_config):
+        changed = changed_keys(self.config, new_config) & self.CONFIG_KEYS
+        self.config = dict(new_config)
+        if changed:
+            self.load_alarms()
+
+    def load_alarms(self):
+        self.definitions = {}
+        for alarm in self.config.get('alarms', []):
+            self.definitions.setdefault(alarm.get('timer') or MAIN_TIMER, []).append(alarm)
+        for name in set(self.entries) | set(self.definitions):
+            self.reschedule(name)
+
+    def on_timer_event(self, event, timer_name, elapsed):
+        if event in ('start', 'stop', 'reset'):
+            self.reschedule(timer_name)
+
+    # Cancel a timer's pending alarms and, if it is running, schedule those still ahead of it
+    def reschedule(self, timer_name):
+        self.scheduler.cancel_all(self.entries.pop(timer_name, {}).values())
+        widget = self.pool.get(timer_name)
+        if widget is None or not widget.timer_running:
+            return
+        now = self.scheduler.clock()
+        elapsed = widget.state.elapsed(now)
+        for alarm in self.definitions.get(timer_name, ()):
+            at = float(alarm['at'])
+            repeat = float(alarm.get('repeat', 0))
+            if at < elapsed:
+                if not repeat:
+                    continue
+                at += math.ceil((elapsed - at) / repeat) * repeat
+            self.schedule(timer_name, alarm, now + at - elapsed)
+
+    def schedule(self, timer_name, alarm, due):
+        entries = self.entries.setdefault(timer_name, {})
+        entry = self.scheduler.add(due, lambda: self.fire(timer_name, alarm, due, entry[1]))
+        entries[entry[1]] = entry
+
+    def fire(self, timer_name, alarm, due, sequence):
+        self.entries.get(timer_name, {}).pop(sequence, None)
+        alert = alarm.get('alert', 'flash')
+        widget = self.pool.get(timer_name)
+        if widget is not None and alert in ('flash', 'both'):
+            widget.flash()
+        if alert in ('sound', 'both'):
+            QApplication.beep()
+        self.alarm_fired.emit(alarm.get('name', ''), timer_name, alert)
+        repeat = float(alarm.get('repeat', 0))
+        if repeat:
+            self.schedule(timer_name, alarm, due + repeat)
@@ -0,0 +1,58 @@
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
+from alarms import Alarms
+from config_manager import ConfigManager
+from timer_pool import TimerPool
+
+RUN_SECONDS = 3.0
+ALARM_COUNTS = (10, 1000, 10000)
+
+# The previous approach: check every deadline on each display update
+def poll_deadlines(deadlines, elapsed):
+    return [deadline for deadline in deadlines if deadline <= elapsed]
+
+def run(app, count):
+    rng = random.Random(count)
+    config = ConfigManager().get_default_config()
+    config['alarms'] = [{'name': f"alarm {i}", 'at': rng.uniform(3600, 36000), 'alert': 'flash'} for i in range(count)]
+    pool = TimerPool(config)
+    alarms = Alarms(pool, config)
+
+    start = time.perf_counter()
+    pool.start()
+    schedule_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    pool.reset()
+    reset_ms = (time.perf_counter() - start) * 1000
+
+    deadlines = [alarm['at'] for alarm in config['alarms']]
+    start = time.perf_counter()
+    for _ in range(100):
+        poll_deadlines(deadlines, 10.0)
+    poll_us = (time.perf_counter() - start) / 100 * 1e6
+
+    # Idle with every alarm pending: only the display ticks should wake the loop
+    alarm_wakeups = alarms.scheduler.wakeups
+    tick_wakeups = pool.scheduler.wakeups
+    QTimer.singleShot(int(RUN_SECONDS * 1000), app.quit)
+    app.exec()
+    alarm_rate = (alarms.scheduler.wakeups - alarm_wakeups) / RUN_SECONDS
+    tick_rate = (pool.scheduler.wakeups - tick_wakeups) / RUN_SECONDS
+    print(f"{count:>7} {schedule_ms:>12.2f} {reset_ms:>10.2f} {poll_us:>14.1f} {alarm_rate:>14.2f} {tick_rate:>13.2f}")
+    pool.stop()
+    for widget in pool.widgets.values():
+        widget.close()
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    print(f"{'alarms':>7} {'schedule ms':>12} {'reset ms':>10} {'poll/tick us':>14} {'alarm wakes/s':>14} {'tick wakes/s':>13}")
+    for count in ALARM_COUNTS:
+        run(app, count)
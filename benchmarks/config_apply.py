@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+from multiprocessing import Process, Event
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, os.path.join(BENCH_DIR, 'stubs'))
+
+import keyboard
+from PySide6.QtWidgets import QApplication
+from config_manager import ConfigManager
+from timer_widget import TimerWidget
+from hotkeyhandler import HotkeyHandler
+from stats import summarize
+
+ROUNDS = 200
+
+# Alternate values for the settings a user touches in the dialog
+CHANGES = {
+    'color': ('red', 'green'),
+    'position': ('top_left', 'bottom_right'),
+    'resolution': ('seconds', 'tenths'),
+    'start_key': ('F5', 'F1'),
+}
+
+# Time one preview apply per round, as TimerApp.update_config_preview does it
+def bench_change(widget, handler, config, key, apply):
+    samples = []
+    for i in range(ROUNDS):
+        config[key] = CHANGES[key][i % 2]
+        start = time.perf_counter()
+        apply(widget, handler, config)
+        samples.append(time.perf_counter() - start)
+    summary = summarize(samples)
+    return summary['p50_us'], summary['p99_us']
+
+def apply_diff(widget, handler, config):
+    widget.update_config(config)
+    handler.update_config(config)
+
+# The original kill key watcher: a child process polling the key until told to stop
+def kill_process(pid, exit_event, kill_key):
+    while not exit_event.is_set():
+        if keyboard.is_pressed(kill_key):
+            exit_event.set()
+
+# The original HotkeyHandler's apply path: drop every hook, stop the kill key process, then hook the
+# keys again and spawn a new kill key process, whatever changed
+class BaselineHotkeys:
+    def __init__(self, config):
+        self.config = config
+        self.kill_process = None
+        self.exit_event = Event()
+        self.setup_hotkeys()
+
+    def setup_hotkeys(self):
+        keyboard.on_press_key(self.config['start_key'], print, suppress=False)
+        keyboard.on_press_key(self.config['stop_key'], print, suppress=False)
+        if 'kill_key' in self.config:
+            self.kill_process = Process(target=kill_process, args=(os.getpid(), self.exit_event, self.config['kill_key']))
+            self.kill_process.start()
+
+    def update_config(self, new_config):
+        keyboard.unhook_all()
+        if self.kill_process:
+            self.exit_event.set()
+            self.kill_process.join()
+        self.config = new_config
+        self.exit_event.clear()
+        self.setup_hotkeys()
+
+    def close(self):
+        keyboard.unhook_all()
+        if self.kill_process:
+            self.exit_event.set()
+            self.kill_process.join()
+
+# The previous behaviour: retime, restyle, reposition and rehook on every change
+def apply_full(widget, hotkeys, config):
+    widget.config = dict(config)
+    widget.core.set_timing(widget.config)
+    widget.update_time()
+    widget.scheduler.reschedule()
+    widget.atlas = None
+    widget.update_label_style()
+    widget.update_mirrors()
+    widget.position_cache.clear()
+    widget.update_position()
+    hotkeys.update_config(dict(config))
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    config = ConfigManager().get_default_config()
+    widget = TimerWidget(config)
+    widget.show()
+    handler = HotkeyHandler(config)
+    diffs = {key: bench_change(widget, handler, dict(config), key, apply_diff) for key in CHANGES}
+    handler.close()
+    # Measured after the diffed path, since the baseline's kill key process keeps a core busy
+    baseline = BaselineHotkeys(dict(config))
+    fulls = {key: bench_change(widget, baseline, dict(config), key, apply_full) for key in CHANGES}
+    baseline.close()
+
+    print(f"{'change':<12} {'full p50':>10} {'full p99':>10} {'diff p50':>10} {'diff p99':>10}  (microseconds)")
+    for key in CHANGES:
+        full, diff = fulls[key], diffs[key]
+        print(f"{key:<12} {full[0]:>10.1f} {full[1]:>10.1f} {diff[0]:>10.1f} {diff[1]:>10.1f}")
@@ -0,0 +1,82 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_manager import ConfigManager
+
+ROUNDS = 50
+# Timers in the written configs, so a write takes long enough to be interrupted part way
+TIMERS = 2000
+
+# Two valid configs that differ everywhere; after any interruption the file must equal one of them
+def configs():
+    manager = ConfigManager()
+    return [{**manager.get_default_config(), 'color': color,
+             'timers': [{'name': f"{color}{i}", 'offset_y': i} for i in range(TIMERS)]}
+            for color in ('red', 'blue')]
+
+# Child process: write the two configs alternately as fast as possible until killed
+def child(path):
+    manager = ConfigManager(path)
+    datas = [json.dumps(config) for config in configs()]
+    print('ready', flush=True)
+    while True:
+        for data in datas:
+            manager.write_atomic(data)
+
+def read(path):
+    with open(path) as f:
+        return json.load(f)
+
+# A write that raises part way must leave the old file and no temporary file behind
+def check_raise(directory):
+    path = os.path.join(directory, 'raise.json')
+    manager = ConfigManager(path)
+    old, new = configs()
+    manager.write_atomic(json.dumps(old))
+    original_fsync = os.fsync
+
+    def failing_fsync(fd):
+        raise OSError("disk full")
+    os.fsync = failing_fsync
+    try:
+        manager.write_atomic(json.dumps(new))
+    except OSError:
+        pass
+    finally:
+        os.fsync = original_fsync
+    leftovers = [name for name in os.listdir(directory) if name.endswith('.tmp')]
+    return read(path) == old and not leftovers
+
+# Kill a writing child at a random moment; config.json must still parse and hold one of the configs
+def run_round(directory, rng, expected):
+    path = os.path.join(directory, 'config.json')
+    process = subprocess.Popen([sys.executable, __file__, '--child', path], stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()
+    time.sleep(rng.uniform(0.01, 0.2))
+    process.kill()
+    process.wait()
+    try:
+        config = read(path)
+    except (OSError, ValueError):
+        return False
+    return {key: value for key, value in config.items() if key != 'config_version'} in expected
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        child(sys.argv[2])
+    rng = random.Random()
+    expected = configs()
+    with tempfile.TemporaryDirectory() as directory:
+        raise_ok = check_raise(directory)
+        failures = sum(not run_round(directory, rng, expected) for _ in range(ROUNDS))
+    print(f"write raising part way: {'old file kept' if raise_ok else 'FILE DAMAGED'}")
+    print(f"{ROUNDS} kills during writes, {failures} damaged files")
+    if failures or not raise_ok:
+        sys.exit(1)
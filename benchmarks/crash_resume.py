@@ -0,0 +1,107 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkpoint import Checkpoint
+from timer_core import TimerState, MAIN_TIMER
+
+ROUNDS = 50
+# Allowed difference between the resumed and the last reported elapsed time, in seconds
+TOLERANCE = 0.01
+# Timers run side by side, so every one of them must get a slot of its own; the first one records splits
+TIMERS = (MAIN_TIMER, 'second', 'third')
+
+# Child process: start, stop, reset and split timers at random, reporting each change and then checkpointing it
+def child(path, seed):
+    rng = random.Random(seed)
+    checkpoint = Checkpoint(path)
+    states = {name: TimerState(name) for name in TIMERS}
+    # Restore every timer before any save, as the app does on launch
+    for state in states.values():
+        checkpoint.restore(state, time.monotonic())
+    splits = checkpoint.restore_splits(MAIN_TIMER) or []
+    while True:
+        now = time.monotonic()
+        state = states[rng.choice(TIMERS)]
+        action = rng.choice(('start', 'stop', 'reset', 'split'))
+        if action == 'start' and not state.running:
+            state.start(now)
+            if state.name == MAIN_TIMER:
+                splits = []
+        elif action == 'stop':
+            state.stop(now)
+        elif action == 'reset':
+            state.reset(now)
+            if state.name == MAIN_TIMER:
+                splits = []
+        elif action == 'split' and state.name == MAIN_TIMER and state.running:
+            splits.append(state.elapsed(now))
+        report = {'timer': state.name, 'elapsed': state.elapsed(now), 'running': state.running, 'wall': time.time()}
+        if state.name == MAIN_TIMER:
+            report['splits'] = splits
+        print(json.dumps(report), flush=True)
+        checkpoint.save(state, now)
+        if state.name == MAIN_TIMER:
+            checkpoint.save_splits(MAIN_TIMER, splits)
+        time.sleep(rng.uniform(0, 0.02))
+
+# Elapsed time a reported state should show at the given wall-clock time
+def expected(report, wall):
+    if report['running']:
+        return report['elapsed'] + wall - report['wall']
+    return report['elapsed']
+
+# Kill the child at a random point, resume every timer from the checkpoint and compare with what the
+# child last reported for it. The kill can land between a report and its checkpoint write, so the
+# report before it also counts.
+def run_round(path, rng):
+    process = subprocess.Popen([sys.executable, __file__, '--child', path, str(rng.random())],
+                               stdout=subprocess.PIPE, text=True)
+    time.sleep(rng.uniform(0.05, 0.5))
+    process.kill()
+    output, _ = process.communicate()
+    reports = [json.loads(line) for line in output.splitlines() if line.endswith('}')]
+
+    checkpoint = Checkpoint(path)
+    now = time.monotonic()
+    wall = time.time()
+    ok = True
+    worst = 0.0
+    for name in TIMERS:
+        state = TimerState(name)
+        restored = checkpoint.restore(state, now)
+        own = [report for report in reports if report['timer'] == name][-2:]
+        if not own:
+            continue
+        resumed = state.elapsed(now)
+        errors = [abs(resumed - expected(report, wall)) for report in own if report['running'] == state.running]
+        error = min(errors, default=float('inf'))
+        ok = ok and restored and error <= TOLERANCE
+        if error != float('inf'):
+            worst = max(worst, error)
+        if name == MAIN_TIMER:
+            ok = ok and (checkpoint.restore_splits(MAIN_TIMER) or []) in [report['splits'] for report in own]
+    checkpoint.close()
+    return ok, worst
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        child(sys.argv[2], float(sys.argv[3]))
+    rng = random.Random()
+    failures = 0
+    worst = 0.0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'state.bin')
+        for _ in range(ROUNDS):
+            ok, error = run_round(path, rng)
+            failures += not ok
+            worst = max(worst, error)
+    print(f"{ROUNDS} kills with {len(TIMERS)} timers, {failures} wrong resumes, worst error {worst * 1000:.2f} ms")
+    if failures:
+        sys.exit(1)
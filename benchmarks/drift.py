@@ -0,0 +1,120 @@
+import os
+import random
+import sys
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+from timer_widget import TimerWidget
+from timer_scheduler import TimerScheduler
+from timer_core import RESOLUTIONS, STOPWATCH, COUNTDOWN, COALESCE_FRACTION, next_wakeup
+
+# Simulated run length
+SIMULATED_HOURS = 4
+# Simulated load on the event loop: every wakeup runs up to LOAD_MAX_STALL seconds late, and one in
+# LOST_TICK_CHANCE is held up for up to LOST_TICK_MAX_STALL seconds, losing every tick in between
+LOAD_MAX_STALL = 0.004
+LOST_TICK_CHANCE = 0.02
+LOST_TICK_MAX_STALL = 10.0
+
+# Simulated clock that only moves when the benchmark steps it, so hours pass in seconds without the
+# real event loop's millisecond timer granularity turning into simulated seconds of lateness
+class SteppedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+# Scheduler that records the time it would arm its timer for instead of waiting for it in real time
+class SteppedScheduler(TimerScheduler):
+    def __init__(self, clock):
+        super().__init__(clock=clock)
+        self.armed = None
+
+    def reschedule(self, now=None):
+        self.armed = next_wakeup(self.views)
+
+# Parse hh:mm:ss[.fff] back into seconds
+def parse_display(text):
+    clock, _, fraction = text.partition('.')
+    hours, minutes, seconds = (int(part) for part in clock.split(':'))
+    value = hours * 3600 + minutes * 60 + seconds
+    if fraction:
+        value += int(fraction) / 10 ** len(fraction)
+    return value
+
+# Countdowns get this much longer than the run, so they are still running when it ends
+COUNTDOWN_SPARE = 60
+
+def run(resolution, mode):
+    app = QApplication.instance() or QApplication(sys.argv)
+    rng = random.Random(f"{mode} {resolution}")
+    duration = SIMULATED_HOURS * 3600
+    countdown = duration + COUNTDOWN_SPARE
+    config = {'color': 'green', 'position': 'top_left', 'screen_index': 0, 'resolution': resolution,
+              'mode': mode, 'duration': countdown if mode == COUNTDOWN else 0}
+    clock = SteppedClock()
+    scheduler = SteppedScheduler(clock)
+    widget = TimerWidget(config, scheduler)
+    step = RESOLUTIONS[resolution][0] / 1000
+    # A wakeup may be put off by at most the coalescing window beyond the stall the load caused
+    allowed_lateness = step * COALESCE_FRACTION + 1e-9
+
+    # Every tick, compare what is shown with the time the benchmark has stepped the clock through since
+    # the start. A core that counted ticks instead of reading the clock would fall behind on every late
+    # or lost one. A stopwatch floors the time, so the shown value must lag the reference by less than
+    # one display step; a countdown rounds the remaining time up, so it must lead the reference remaining
+    # time by less than one step. Anything more is drift.
+    def display_error(elapsed):
+        if mode == COUNTDOWN:
+            return parse_display(widget.text) - (countdown - elapsed)
+        return elapsed - parse_display(widget.text)
+
+    stall = [0.0]
+    worst = {'error': 0.0, 'lateness': 0.0, 'ticks': 0, 'bad': 0}
+    update_time = widget.update_time
+
+    def checked_update_time(now=None):
+        due = widget.next_due
+        update_time(now)
+        error = display_error(now - started_at)
+        worst['error'] = max(worst['error'], abs(error))
+        # Lateness the scheduler added on top of the simulated stall
+        worst['lateness'] = max(worst['lateness'], now - stall[0] - due)
+        worst['ticks'] += 1
+        worst['bad'] += not -1e-6 <= error < step
+    widget.update_time = checked_update_time
+
+    widget.start_timer()
+    started_at = clock.now
+    # A countdown starts by showing its full duration
+    first_ok = mode != COUNTDOWN or parse_display(widget.text) == countdown
+    end = started_at + duration
+    while scheduler.armed is not None:
+        if rng.random() < LOST_TICK_CHANCE:
+            stall[0] = rng.uniform(0, LOST_TICK_MAX_STALL)
+        else:
+            stall[0] = rng.uniform(0, LOAD_MAX_STALL)
+        clock.now = scheduler.armed + stall[0]
+        if clock.now >= end:
+            break
+        scheduler.tick()
+    clock.now = end
+    widget.stop_timer()
+
+    # Every display, including the one after stopping, must be within one display step of the reference
+    final_error = display_error(end - started_at)
+    ok = (-1e-6 <= final_error < step and not worst['bad'] and first_ok
+          and worst['lateness'] <= allowed_lateness)
+    print(f"{mode:<9} {resolution:<13} ticks={worst['ticks']:<7} simulated={(end - started_at) / 3600:.2f}h "
+          f"worst tick error={worst['error']:.3f}s worst extra lateness={worst['lateness'] * 1000:.3f}ms "
+          f"(allowed {allowed_lateness * 1000:.3f}ms) final error={final_error:.4f}s {'OK' if ok else 'DRIFT'}")
+    widget.deleteLater()
+    app.processEvents()
+    return ok
+
+if __name__ == '__main__':
+    results = [run(resolution, mode) for mode in (STOPWATCH, COUNTDOWN) for resolution in RESOLUTIONS]
+    sys.exit(0 if all(results) else 1)
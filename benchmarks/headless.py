@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+ROUNDS = 5
+
+# Child for the overlay build: construct TimerApp offscreen and report once the overlay is first shown
+GUI_CHILD = """
+import sys, time
+start = time.perf_counter()
+from timer_widget import TimerWidget
+from main import TimerApp
+shown = []
+original_show = TimerWidget.show
+def timed_show(widget):
+    shown.append(time.perf_counter())
+    original_show(widget)
+TimerWidget.show = timed_show
+app = TimerApp(sys.argv[:1])
+while not shown:
+    app.processEvents()
+print('shown', flush=True)
+sys.stdin.readline()
+"""
+
+def rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+# Start a child, time it until its first line of output and read its resident memory at that point
+def measure(command, env):
+    start = time.perf_counter()
+    child = subprocess.Popen(command, cwd=tempfile.gettempdir(), env=env, text=True,
+                             stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    line = child.stdout.readline()
+    ready_ms = (time.perf_counter() - start) * 1000
+    rss = rss_kb(child.pid)
+    child.stdin.write('quit\n')
+    child.stdin.close()
+    child.wait(10)
+    return (ready_ms, rss) if line else None
+
+def bench(command, env):
+    samples = [measure(command, env) for _ in range(ROUNDS)]
+    if None in samples:
+        return None
+    samples.sort()
+    return {'first_output_ms': samples[len(samples) // 2][0], 'rss_kb': max(rss or 0 for _, rss in samples)}
+
+# Startup time to first output and resident memory of the headless mode versus the overlay
+if __name__ == '__main__':
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join((ROOT_DIR, os.path.join(BENCH_DIR, 'stubs'))),
+               QT_QPA_PLATFORM='offscreen')
+    results = {'headless': bench([sys.executable, os.path.join(ROOT_DIR, 'main.py'), '--headless'], env)}
+    try:
+        import PySide6
+        results['overlay'] = bench([sys.executable, '-c', GUI_CHILD], env)
+    except ImportError:
+        results['overlay'] = None
+    print(json.dumps(results, indent=2))
+    if results['headless'] and results['overlay']:
+        print(f"headless starts in {results['headless']['first_output_ms'] / results['overlay']['first_output_ms']:.0%} "
+              f"of the overlay's time with {results['headless']['rss_kb'] / results['overlay']['rss_kb']:.0%} of its memory")
@@ -0,0 +1,64 @@
+import os
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
+from config_manager import ConfigManager
+from hotkeyhandler import HotkeyHandler
+
+# Synthetic auto-repeat downs per held key, and how many hold/release cycles per key
+REPEATS = 5000
+CYCLES = 20
+
+# Hold the start and stop keys in turn, flooding the hook with repeats, from a separate thread
+def flood(backend, config, done):
+    for _ in range(CYCLES):
+        for key in (config['start_key'], config['stop_key']):
+            for _ in range(REPEATS):
+                backend.key_down(key)
+            backend.key_up(key)
+    done.set()
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    config = ConfigManager().get_default_config()
+    config['hotkey_backend'] = 'fake'
+    handler = HotkeyHandler(config)
+    dispatcher = handler.dispatcher
+    received = []
+    handler.start_signal.connect(lambda: received.append('start'))
+    handler.stop_signal.connect(lambda: received.append('stop'))
+
+    done = threading.Event()
+    # Keep the GUI loop polling while the flood runs, and stop once it is drained
+    def check_done():
+        if done.is_set() and not dispatcher.pending and not dispatcher.flush_posted:
+            app.exit()
+    poll = QTimer()
+    poll.timeout.connect(check_done)
+    poll.start(10)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    threading.Thread(target=flood, args=(handler.backend, config, done), daemon=True).start()
+    app.exec()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    injected = CYCLES * 2 * REPEATS
+    expected = CYCLES * 2
+    print(f"injected key downs      {injected}")
+    print(f"legacy queued signals   {injected}  (one per down, repeats included)")
+    print(f"repeats dropped on hook {dispatcher.repeats_dropped}")
+    print(f"GUI wakeups             {dispatcher.wakeups}")
+    print(f"actions delivered       {len(received)}  (expected {expected})")
+    print(f"wall {wall * 1000:.1f} ms, CPU {cpu * 1000:.1f} ms")
+    handler.close()
+    if len(received) != expected or dispatcher.wakeups > expected:
+        sys.exit("hotkey flood reached the GUI thread")
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+from multiprocessing import Process, Event
+import psutil
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, os.path.join(BENCH_DIR, 'stubs'))
+
+IDLE_SECONDS = 5.0
+KILL_KEY = 'F3'
+
+# Reproduction of the old busy-polling kill process, kept for comparison
+def legacy_kill_process(exit_event, kill_key):
+    import keyboard
+    while not exit_event.is_set():
+        if keyboard.is_pressed(kill_key):
+            exit_event.set()
+
+# Sum user and system CPU seconds for each process
+def cpu_seconds(processes):
+    return {name: sum(proc.cpu_times()[:2]) for name, proc in processes.items()}
+
+# Measure CPU used by each process over an idle window
+def measure(processes, wait):
+    before = cpu_seconds(processes)
+    start = time.monotonic()
+    wait()
+    elapsed = time.monotonic() - start
+    after = cpu_seconds(processes)
+    return {name: (after[name] - before[name]) / elapsed * 100 for name in processes}
+
+def bench_legacy():
+    exit_event = Event()
+    child = Process(target=legacy_kill_process, args=(exit_event, KILL_KEY))
+    child.start()
+    time.sleep(0.5)
+    try:
+        return measure({'main': psutil.Process(), 'kill_process': psutil.Process(child.pid)},
+                       lambda: time.sleep(IDLE_SECONDS))
+    finally:
+        exit_event.set()
+        child.join()
+
+def bench_hooks():
+    from PySide6.QtCore import QCoreApplication, QTimer
+    from hotkeyhandler import HotkeyHandler
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    handler = HotkeyHandler({'start_key': 'F1', 'stop_key': 'F2', 'kill_key': KILL_KEY})
+
+    def idle():
+        QTimer.singleShot(int(IDLE_SECONDS * 1000), app.quit)
+        app.exec()
+
+    result = measure({'main': psutil.Process()}, idle)
+    handler.close()
+    return result
+
+def report(label, result):
+    print(f"{label}:")
+    for name, percent in result.items():
+        print(f"  {name:<14} {percent:6.2f}% CPU")
+
+if __name__ == '__main__':
+    report("before (polling kill process)", bench_legacy())
+    report("after (kill key hook)", bench_hooks())
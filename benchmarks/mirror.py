@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+from config_manager import ConfigManager
+from timer_widget import TimerWidget
+from timer_core import format_elapsed
+from stats import summarize
+
+TICKS = 2000
+WINDOW_COUNTS = (1, 2, 4)
+
+# Time one tick on every window, flushing the resulting paints through the event loop
+def bench(app, widgets, texts):
+    samples = []
+    for text in texts:
+        start = time.perf_counter()
+        for widget in widgets:
+            widget.set_display_text(text)
+        app.processEvents()
+        samples.append(time.perf_counter() - start)
+    summary = summarize(samples)
+    return summary['p50_us'], summary['p99_us']
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    config = ConfigManager().get_default_config()
+    config['resolution'] = 'tenths'
+    texts = [format_elapsed(i / 10, 1) for i in range(TICKS)]
+
+    print(f"{'windows':<8} {'separate p50':>13} {'separate p99':>13} {'mirror p50':>11} {'mirror p99':>11}  (microseconds)")
+    for count in WINDOW_COUNTS:
+        # One independent overlay per screen, each painting its own glyphs
+        separate = [TimerWidget(config) for _ in range(count)]
+        for widget in separate:
+            widget.show()
+        app.processEvents()
+        before = bench(app, separate, texts)
+        for widget in separate:
+            widget.close()
+
+        # One overlay rendering into the shared frame, blitted by count - 1 mirrors.
+        # The offscreen platform has one screen, so the mirrors are shown by hand.
+        widget = TimerWidget({**config, 'mirror_screens': list(range(1, count))})
+        widget.show()
+        for mirror in widget.mirrors.values():
+            mirror.resize(widget.sizeHint())
+            mirror.show()
+        app.processEvents()
+        after = bench(app, [widget], texts)
+        widget.close()
+
+        print(f"{count:<8} {before[0]:>13.1f} {before[1]:>13.1f} {after[0]:>11.1f} {after[1]:>11.1f}")
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+from config_manager import ConfigManager
+from timer_widget import TimerWidget
+from timer_core import RESOLUTIONS, format_elapsed
+from stats import summarize
+
+TICKS = 2000
+
+# The previous overlay: a stylesheet-styled QLabel inside a layout
+class LabelOverlay(QWidget):
+    def __init__(self, config):
+        super().__init__()
+        self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.Tool)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        layout = QVBoxLayout()
+        self.time_label = QLabel('00:00:00')
+        self.time_label.setFont(QFont(config.get('font', 'Courier'), config.get('font_size', 48), QFont.Weight.Bold))
+        self.time_label.setStyleSheet(f"""
+            color: {config['color']};
+            background-color: rgba(0, 0, 0, 100);
+            border-radius: 10px;
+            padding: 0px;
+        """)
+        layout.addWidget(self.time_label, alignment=Qt.AlignmentFlag.AlignCenter)
+        self.setLayout(layout)
+
+    def tick(self, text):
+        self.time_label.setText(text)
+        self.adjustSize()
+
+# Time applying a tick and flushing the resulting paint through the event loop
+def bench(app, tick, texts):
+    samples = []
+    for text in texts:
+        start = time.perf_counter()
+        tick(text)
+        app.processEvents()
+        samples.append(time.perf_counter() - start)
+    summary = summarize(samples)
+    return summary['p50_us'], summary['p99_us']
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    print(f"{'resolution':<13} {'label p50':>10} {'label p99':>10} {'atlas p50':>10} {'atlas p99':>10}  (microseconds)")
+    for resolution, (interval, decimals) in RESOLUTIONS.items():
+        config = ConfigManager().get_default_config()
+        config['resolution'] = resolution
+        texts = [format_elapsed(i * interval / 1000, decimals) for i in range(TICKS)]
+
+        label = LabelOverlay(config)
+        label.show()
+        app.processEvents()
+        before = bench(app, label.tick, texts)
+        label.close()
+
+        widget = TimerWidget(config)
+        widget.show()
+        app.processEvents()
+        after = bench(app, widget.set_display_text, texts)
+        widget.close()
+
+        print(f"{resolution:<13} {before[0]:>10.1f} {before[1]:>10.1f} {after[0]:>10.1f} {after[1]:>10.1f}")
@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, 'stubs'))
+
+import keyboard
+from stats import summarize
+
+TICKS = 2000
+PREVIEWS = 200
+HOTKEY_PRESSES = 200
+IDLE_SECONDS = 3.0
+
+# Alternate values for the settings a user touches in the dialog
+PREVIEW_CHANGES = {
+    'color': ('red', 'green'),
+    'position': ('top_left', 'bottom_right'),
+    'resolution': ('seconds', 'tenths'),
+    'start_key': ('F5', 'F1'),
+}
+
+def current_rss_kb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        return None
+
+# Construct TimerApp and measure until its TimerWidget is first shown
+def bench_startup():
+    start = time.perf_counter()
+    from timer_widget import TimerWidget
+    from main import TimerApp
+
+    shown = []
+    original_show = TimerWidget.show
+
+    def timed_show(widget):
+        shown.append(time.perf_counter())
+        original_show(widget)
+    TimerWidget.show = timed_show
+    try:
+        app = TimerApp(sys.argv[:1])
+        while not shown:
+            app.processEvents()
+    finally:
+        TimerWidget.show = original_show
+    return app, {'first_show_ms': (shown[0] - start) * 1000}
+
+# Cost of one update_time call plus the paint it triggers
+def bench_tick(app):
+    widget = app.timer_widget
+    results = {}
+    for resolution in ('seconds', 'tenths', 'milliseconds'):
+        config = dict(app.config, resolution=resolution)
+        widget.update_config(config)
+        widget.start_timer()
+        widget.scheduler.timer.stop()
+        samples = []
+        for _ in range(TICKS):
+            start = time.perf_counter()
+            widget.update_time()
+            widget.scheduler.timer.stop()
+            app.processEvents()
+            samples.append(time.perf_counter() - start)
+        widget.stop_timer()
+        results[resolution] = summarize(samples)
+    widget.update_config(app.config)
+    return results
+
+# Latency from a SettingsDialog preview emission until every subsystem applied it
+def bench_preview(app):
+    dialog = app.ensure_settings_dialog()
+    results = {}
+    for key, values in PREVIEW_CHANGES.items():
+        config = dict(app.config)
+        samples = []
+        for i in range(PREVIEWS):
+            config[key] = values[i % 2]
+            start = time.perf_counter()
+            dialog.config_updated.emit(config)
+            samples.append(time.perf_counter() - start)
+        results[key] = summarize(samples)
+    app.update_config_preview(app.config)
+    return results
+
+# Latency from the keyboard hook thread to TimerWidget.start_timer on the GUI thread
+def bench_hotkey(app):
+    widget = app.timer_widget
+    while app.hotkey_handler is None:
+        app.processEvents()
+    pressed = [0.0]
+    samples = []
+
+    def on_start():
+        samples.append(time.perf_counter() - pressed[0])
+    app.hotkey_handler.start_signal.connect(on_start)
+
+    for _ in range(HOTKEY_PRESSES):
+        widget.stop_timer()
+        count = len(samples)
+
+        def press():
+            pressed[0] = time.perf_counter()
+            keyboard.press(app.config['start_key'])
+        thread = threading.Thread(target=press)
+        thread.start()
+        thread.join()
+        while len(samples) == count:
+            app.processEvents()
+    app.hotkey_handler.start_signal.disconnect(on_start)
+    widget.stop_timer()
+    return summarize(samples)
+
+# CPU used while the overlay sits idle, with and without a running timer
+def bench_idle(app):
+    from PySide6.QtCore import QTimer
+    results = {}
+    for label, running in (('stopped', False), ('running', True)):
+        if running:
+            app.timer_widget.start_timer()
+        cpu_start = time.process_time()
+        wall_start = time.monotonic()
+        QTimer.singleShot(int(IDLE_SECONDS * 1000), app.exit)
+        app.exec()
+        wall = time.monotonic() - wall_start
+        results[label] = {'cpu_percent': (time.process_time() - cpu_start) / wall * 100}
+        app.timer_widget.stop_timer()
+    return results
+
+def bench_memory():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak //= 1024
+    return {'rss_kb': current_rss_kb(), 'peak_rss_kb': peak}
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Flatten nested results into dotted metric names for comparison
+def flatten(results, prefix=''):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + '.'))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+# Print every metric that moved by more than the threshold between two result files
+def compare(baseline_path, results, threshold):
+    with open(baseline_path) as f:
+        baseline = flatten(json.load(f)['results'])
+    current = flatten(results)
+    for name in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[name], current[name]
+        if old and abs(new - old) / abs(old) > threshold:
+            print(f"{name:<40} {old:>12.2f} -> {new:>12.2f} ({(new - old) / abs(old) * 100:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the headless Timer benchmark suite")
+    parser.add_argument('--output', default='bench_output.json', help="file to write JSON results to")
+    parser.add_argument('--compare', help="previous results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.1, help="relative change reported by --compare")
+    args = parser.parse_args()
+
+    app, startup = bench_startup()
+    results = {'startup': startup}
+    results['tick'] = bench_tick(app)
+    results['preview'] = bench_preview(app)
+    results['hotkey'] = bench_hotkey(app)
+    results['idle'] = bench_idle(app)
+    results['memory'] = bench_memory()
+
+    from PySide6 import __version__ as pyside_version
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'pyside': pyside_version,
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    if args.compare:
+        compare(args.compare, results, args.threshold)
+    app.quit()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
+from config_manager import ConfigManager
+from event_bus import EventBus
+from timer_widget import TimerWidget
+from stats import summarize
+
+RUN_SECONDS = 3.0
+# Runs per subscriber; the median of their p90 lateness is compared, so one stray stall cannot decide it
+ROUNDS = 3
+# Extra p90 tick lateness allowed with a blocked subscriber, in milliseconds. A subscriber run on the GUI
+# thread would add its whole half second.
+ALLOWED_EXTRA_MS = 5.0
+
+# A subscriber stuck on I/O: a script or webhook that takes half a second
+def sleeping_handler(event):
+    time.sleep(0.5)
+
+# A subscriber burning CPU in Python, competing with the GUI thread for the GIL
+def busy_handler(event):
+    end = time.perf_counter() + 0.05
+    while time.perf_counter() < end:
+        pass
+
+# Run a milliseconds timer that publishes an event on every tick, about 180 ticks in all, and
+# measure how late each tick ran
+def run(app, handler):
+    bus = EventBus()
+    subscription = bus.subscribe(handler) if handler else None
+    config = ConfigManager().get_default_config()
+    config['resolution'] = 'milliseconds'
+    widget = TimerWidget(config)
+    widget.show()
+
+    lateness = []
+    update_time = widget.update_time
+    def measured_update_time(now=None):
+        if now is not None:
+            lateness.append(now - widget.next_due)
+        update_time(now)
+        bus.publish('threshold', {'timer': widget.state.name, 'elapsed': widget.elapsed})
+    widget.update_time = measured_update_time
+
+    widget.start_timer()
+    QTimer.singleShot(int(RUN_SECONDS * 1000), app.quit)
+    app.exec()
+    widget.stop_timer()
+    widget.close()
+    bus.close(timeout=0)
+
+    summary = summarize(lateness)
+    dropped = subscription.dropped if subscription else 0
+    return len(lateness), summary['p50_us'] / 1000, summary['p90_us'] / 1000, dropped
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    print(f"{'subscriber':<10} {'round':>6} {'ticks':>6} {'late p50 ms':>12} {'late p90 ms':>12} {'dropped':>8}")
+    results = {}
+    for label, handler in (('none', None), ('sleeping', sleeping_handler), ('busy', busy_handler)):
+        p90s = []
+        for round_index in range(ROUNDS):
+            ticks, p50, p90, dropped = run(app, handler)
+            p90s.append(p90)
+            print(f"{label:<10} {round_index + 1:>6} {ticks:>6} {p50:>12.2f} {p90:>12.2f} {dropped:>8}")
+        results[label] = sorted(p90s)[ROUNDS // 2]
+    # A busy Python handler still shares the GIL, so only the blocked one is held to the limit
+    if results['sleeping'] - results['none'] > ALLOWED_EXTRA_MS:
+        sys.exit("a slow subscriber delayed timer ticks")
@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+from config_manager import ConfigManager
+from splits import Splits
+from timer_widget import TimerWidget
+from stats import summarize
+
+TICKS = 20000
+SEGMENT_COUNTS = (10, 100, 1000)
+
+# Split file with a full personal best, one segment every 30 seconds
+def write_splits(directory, count):
+    path = os.path.join(directory, f"splits{count}.json")
+    segments = [{'name': f"segment {i}", 'pb': 30.0 * (i + 1), 'gold': 28.0} for i in range(count)]
+    with open(path, 'w') as f:
+        json.dump({'segments': segments}, f)
+    return path
+
+# Median and p99 cost of one update_time call over a simulated run, in microseconds.
+# With splits, the run sits halfway through its segments so deltas come from the middle of the arrays.
+def bench_ticks(widget):
+    widget.start_timer()
+    widget.scheduler.timer.stop()
+    if widget.splits is not None:
+        for index in range(widget.splits.count // 2):
+            widget.splits.split(30.0 * index + 29.0)
+    base = widget.scheduler.clock()
+    samples = []
+    for i in range(TICKS):
+        now = base + i * 0.1
+        start = time.perf_counter()
+        widget.update_time(now)
+        samples.append(time.perf_counter() - start)
+    widget.stop_timer()
+    summary = summarize(samples)
+    return summary['p50_us'], summary['p99_us']
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    config = ConfigManager().get_default_config()
+    config['resolution'] = 'tenths'
+    widget = TimerWidget(config)
+    widget.show()
+
+    print(f"{'segments':<10} {'p50 us':>8} {'p99 us':>8}")
+    p50, p99 = bench_ticks(widget)
+    print(f"{'none':<10} {p50:8.2f} {p99:8.2f}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in SEGMENT_COUNTS:
+            splits = Splits(write_splits(directory, count))
+            widget.set_splits(splits)
+            p50, p99 = bench_ticks(widget)
+            # Ending the run schedules a save; write it before the directory goes away
+            splits.flush()
+            print(f"{count:<10} {p50:8.2f} {p99:8.2f}")
+        widget.set_splits(None)
+    widget.close()
@@ -0,0 +1,12 @@
+# Summarise samples given in seconds as microsecond percentiles
+def summarize(samples):
+    samples = sorted(samples)
+    count = len(samples)
+    return {
+        'count': count,
+        'mean_us': sum(samples) / count * 1e6,
+        'p50_us': samples[count // 2] * 1e6,
+        'p90_us': samples[int(count * 0.9)] * 1e6,
+        'p99_us': samples[min(count - 1, int(count * 0.99))] * 1e6,
+        'max_us': samples[-1] * 1e6,
+    }
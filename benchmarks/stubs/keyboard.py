@@ -0,0 +1,61 @@
+# In-memory stand-in for the keyboard package so benchmarks run headless and without root
+import threading
+import zlib
+
+_hooks = []
+_lock = threading.Lock()
+
+class KeyboardEvent:
+    def __init__(self, event_type, scan_code, name):
+        self.event_type = event_type
+        self.scan_code = scan_code
+        self.name = name
+
+# Fake scan code derived from the key name, stable across calls
+def key_to_scan_codes(key):
+    if not key:
+        raise ValueError(f"Key {key!r} is not mapped to any known key.")
+    return (zlib.crc32(key.lower().encode()) & 0xffff,)
+
+def hook(callback, suppress=False):
+    with _lock:
+        _hooks.append(callback)
+    return callback
+
+def on_press_key(key, callback, suppress=False):
+    scan_codes = key_to_scan_codes(key)
+    return hook(lambda event: event.event_type == 'down' and event.scan_code in scan_codes and callback(event))
+
+def unhook(callback):
+    with _lock:
+        if callback in _hooks:
+            _hooks.remove(callback)
+
+def unhook_all():
+    with _lock:
+        _hooks.clear()
+
+def unhook_all_hotkeys():
+    unhook_all()
+
+def is_pressed(key):
+    return False
+
+def _send(key, event_type):
+    event = KeyboardEvent(event_type, key_to_scan_codes(key)[0], key.lower())
+    with _lock:
+        callbacks = list(_hooks)
+    for callback in callbacks:
+        callback(event)
+
+# Deliver a key down without the matching up, as OS auto-repeat does while a key is held
+def key_down(key):
+    _send(key, 'down')
+
+def key_up(key):
+    _send(key, 'up')
+
+# Deliver a full key press to the hook, as the hook thread would
+def press(key):
+    key_down(key)
+    key_up(key)
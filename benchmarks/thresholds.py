@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timer_core import TimerCore, COUNTDOWN
+
+# Events of a 5 second countdown updated at the given elapsed times, then stopped if still running
+def countdown_events(thresholds, updates):
+    now = [0.0]
+    events = []
+    config = {'mode': COUNTDOWN, 'duration': 5, 'thresholds': thresholds}
+    core = TimerCore(config, clock=lambda: now[0], on_event=lambda event, name, value: events.append((event, value)))
+    core.start()
+    for now[0] in updates:
+        core.update(now[0])
+    core.stop()
+    return events
+
+# Thresholds crossed by the update or stop that ends a session must fire before its stop event
+def check_thresholds():
+    cases = (
+        # A threshold at the duration, reached by the final tick
+        ([5], [1.0, 5.0], [5.0]),
+        # Two thresholds crossed by one late final tick
+        ([3, 4], [1.0, 6.5], [3.0, 4.0]),
+        # A threshold crossed just before a manual stop, with no update in between
+        ([2], [1.0, 2.5], [2.0]),
+    )
+    for thresholds, updates, expected in cases:
+        events = countdown_events(thresholds, updates)
+        names = [event for event, _ in events]
+        fired = [value for event, value in events if event == 'threshold']
+        if names != ['start'] + ['threshold'] * len(expected) + ['stop'] or fired != expected:
+            sys.exit(f"thresholds {thresholds} after updates {updates}: got events {events}")
+
+if __name__ == '__main__':
+    check_thresholds()
+    print("threshold events OK")
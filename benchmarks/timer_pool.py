@@ -0,0 +1,78 @@
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
+from config_manager import ConfigManager
+from timer_pool import TimerPool
+from timer_core import COALESCE_FRACTION
+
+RUN_SECONDS = 3.0
+POOL_SIZES = (1, 10, 50)
+# Staggered runs start the timers at random moments over this many seconds, so their boundaries differ
+STAGGER_SECONDS = 1.0
+# Lateness the real event loop may add on top of the coalescing window, in seconds
+LOOP_SLACK = 0.015
+
+# Start every timer in the pool, all at once or at random moments, and wait until all of them run
+def start_all(app, pool, staggered):
+    if not staggered:
+        for name in pool.widgets:
+            pool.start(name)
+        return
+    for name in pool.widgets:
+        QTimer.singleShot(int(random.uniform(0, STAGGER_SECONDS) * 1000), lambda name=name: pool.start(name))
+    while not all(widget.timer_running for widget in pool.widgets.values()):
+        app.processEvents()
+
+# Count scheduler wakeups per second with every timer in the pool running, and how late the
+# latest display update was against its boundary. Both are checked against next_wakeup's bound:
+# no more than one wakeup per coalescing window, nor more than one per timer per display step (or one
+# per step in all when the timers started together), and no update later than one window.
+def run(app, size, staggered):
+    config = ConfigManager().get_default_config()
+    config['timers'] = [{'name': f"timer{i}", 'position': 'center', 'offset_y': i * 4} for i in range(size - 1)]
+    pool = TimerPool(config)
+    pool.show()
+    app.processEvents()
+    start_all(app, pool, staggered)
+
+    lateness = [0.0]
+    for widget in pool.widgets.values():
+        def timed_update(now=None, widget=widget, update_time=widget.update_time):
+            if now is not None:
+                lateness[0] = max(lateness[0], now - widget.next_due)
+            update_time(now)
+        widget.update_time = timed_update
+
+    wakeups_start = pool.scheduler.wakeups
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+    QTimer.singleShot(int(RUN_SECONDS * 1000), app.exit)
+    app.exec()
+    wall = time.monotonic() - wall_start
+    wakeups = (pool.scheduler.wakeups - wakeups_start) / wall
+    cpu = (time.process_time() - cpu_start) / wall * 100
+    step = pool.main.tick_interval / 1000
+    window = step * COALESCE_FRACTION
+    per_step = 1 if not staggered else min(size, 1 / COALESCE_FRACTION)
+    # One extra wakeup for a boundary at each end of the run
+    allowed_wakeups = per_step / step + 2 / wall
+    allowed_lateness = window + LOOP_SLACK
+    ok = wakeups <= allowed_wakeups and lateness[0] <= allowed_lateness
+    print(f"{size:>5} timers {'staggered' if staggered else 'together ':<9}  {wakeups:6.2f} wakeups/s "
+          f"(<= {allowed_wakeups:5.2f})  {cpu:6.2f}% CPU  worst lateness {lateness[0] * 1000:5.1f} ms "
+          f"(<= {allowed_lateness * 1000:4.1f})  {'OK' if ok else 'OVER'}")
+    for widget in pool.widgets.values():
+        widget.close()
+    return ok
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    results = [run(app, size, staggered) for staggered in (False, True) for size in POOL_SIZES]
+    sys.exit(0 if all(results) else 1)
@@ -29,7 +29,6 @@ def build_executable():
         "--windows-console-mode=disable",
         "--plugin-enable=pyside6",
         "--include-package=keyboard",
-        "--include-package=psutil",
         "--windows-icon-from-ico=icon.ico",
         "--assume-yes-for-downloads",
         "--disable-console",
@@ -0,0 +1,131 @@
+import mmap
+import os
+import struct
+import time
+import zlib
+from session_history import timer_id
+
+MAGIC = b'TMRCKPT2'
+# Slot: timer id, running flag, accumulated seconds, wall-clock time the current running stretch began,
+# wall-clock session start, and a CRC32 of the preceding fields so a torn slot is ignored
+SLOT = struct.Struct('<dddddI4x')
+CHECKED = struct.Struct('<ddddd')
+# Timers that can be checkpointed at once
+SLOTS = 64
+# Split run of the timer using splits, after the slots: timer id, split count, CRC32 of both and the
+# split times, then the times themselves
+RUN_HEADER = struct.Struct('<dII')
+RUN_IDS = struct.Struct('<dI')
+# Splits of a run that can be checkpointed; longer runs resume without their splits
+MAX_SPLITS = 256
+
+class Checkpoint:
+    # Running state of every timer in a small fixed-size memory-mapped file. A save overwrites one
+    # slot in place: the kernel keeps the written page if the process dies, so no fsync or rewrite is
+    # needed. Saves happen on start, stop, reset and split only, never per tick.
+    def __init__(self, path):
+        self.path = path
+        self.run_offset = len(MAGIC) + SLOT.size * SLOTS
+        self.size = self.run_offset + RUN_HEADER.size + 8 * MAX_SPLITS
+        self.offsets = {}
+        with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+            # A file of another size or format is started afresh
+            if os.fstat(f.fileno()).st_size != self.size or f.read(len(MAGIC)) != MAGIC:
+                f.seek(0)
+                f.truncate()
+                f.write(MAGIC)
+                f.truncate(self.size)
+                f.flush()
+            self.map = mmap.mmap(f.fileno(), self.size)
+
+    # Offset of the slot holding a timer, claiming a free one on first use; None when all are taken.
+    # A claimed slot gets the timer's id at once, so the next timer cannot claim it too; its CRC
+    # stays invalid until the first save, so there is nothing to restore from it before that.
+    def slot_offset(self, name):
+        offset = self.offsets.get(name)
+        if offset is not None:
+            return offset
+        wanted = timer_id(name)
+        free = None
+        for index in range(SLOTS):
+            offset = len(MAGIC) + index * SLOT.size
+            slot_id = struct.unpack_from('<d', self.map, offset)[0]
+            if slot_id == wanted:
+                self.offsets[name] = offset
+                return offset
+            if slot_id == 0.0 and free is None:
+                free = offset
+        if free is not None:
+            struct.pack_into('<d', self.map, free, wanted)
+            self.offsets[name] = free
+        return free
+
+    # Free a timer's slot, and its split run, for other timers
+    def clear(self, name):
+        offset = self.offsets.pop(name, None)
+        if offset is not None:
+            self.map[offset:offset + SLOT.size] = bytes(SLOT.size)
+        if struct.unpack_from('<d', self.map, self.run_offset)[0] == timer_id(name):
+            self.map[self.run_offset:self.run_offset + RUN_HEADER.size] = bytes(RUN_HEADER.size)
+
+    # Free the slots of every timer not among the given names, such as timers removed from the config
+    # while the app was not running
+    def retain(self, names):
+        kept = {timer_id(name) for name in names}
+        for index in range(SLOTS):
+            offset = len(MAGIC) + index * SLOT.size
+            slot_id = struct.unpack_from('<d', self.map, offset)[0]
+            if slot_id != 0.0 and slot_id not in kept:
+                self.map[offset:offset + SLOT.size] = bytes(SLOT.size)
+        self.offsets = {name: offset for name, offset in self.offsets.items() if timer_id(name) in kept}
+
+    # Free every slot and the split run, so nothing resumes on the next launch
+    def clear_all(self):
+        self.retain(())
+        self.map[self.run_offset:self.run_offset + RUN_HEADER.size] = bytes(RUN_HEADER.size)
+
+    # Write a timer's state; `now` is the TimerState's monotonic clock reading
+    def save(self, state, now):
+        offset = self.slot_offset(state.name)
+        if offset is None:
+            return
+        resumed_at = time.time() - (now - state.start_time) if state.running else 0.0
+        fields = (timer_id(state.name), 1.0 if state.running else 0.0, state.accumulated, resumed_at, state.started_at)
+        SLOT.pack_into(self.map, offset, *fields, zlib.crc32(CHECKED.pack(*fields)))
+
+    # Put a timer back into its checkpointed state; returns True if there was one
+    def restore(self, state, now):
+        offset = self.slot_offset(state.name)
+        if offset is None:
+            return False
+        *fields, crc = SLOT.unpack_from(self.map, offset)
+        if fields[0] != timer_id(state.name) or crc != zlib.crc32(CHECKED.pack(*fields)):
+            return False
+        _, running, accumulated, resumed_at, started_at = fields
+        state.accumulated = accumulated
+        state.started_at = started_at
+        state.running = bool(running)
+        state.start_time = now - (time.time() - resumed_at) if state.running else now
+        return True
+
+    # Write the split times of a timer's current run
+    def save_splits(self, name, times):
+        count = len(times) if len(times) <= MAX_SPLITS else 0
+        data = struct.pack(f'<{count}d', *times[:count])
+        ids = (timer_id(name), count)
+        crc = zlib.crc32(data, zlib.crc32(RUN_IDS.pack(*ids)))
+        self.map[self.run_offset + RUN_HEADER.size:self.run_offset + RUN_HEADER.size + len(data)] = data
+        RUN_HEADER.pack_into(self.map, self.run_offset, *ids, crc)
+
+    # Split times of a timer's checkpointed run, or None when there are none for it
+    def restore_splits(self, name):
+        slot_id, count, crc = RUN_HEADER.unpack_from(self.map, self.run_offset)
+        if slot_id != timer_id(name) or count > MAX_SPLITS:
+            return None
+        data = self.map[self.run_offset + RUN_HEADER.size:self.run_offset + RUN_HEADER.size + 8 * count]
+        if crc != zlib.crc32(data, zlib.crc32(RUN_IDS.pack(slot_id, count))):
+            return None
+        return list(struct.unpack(f'<{count}d', data))
+
+    def close(self):
+        self.map.close()
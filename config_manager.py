@@ -1,33 +1,153 @@
 import json
 import os
+from hotkey_bindings import is_binding
+from utils import DebouncedWriter, write_atomic
+
+# Version written to config files; bump it and add a migration when the format changes
+CONFIG_VERSION = 2
+
+# Return the set of keys whose values differ between two configurations
+def changed_keys(old_config, new_config):
+    return {key for key in old_config.keys() | new_config.keys() if old_config.get(key) != new_config.get(key)}
+
+# Version 1 files predate the version key; their keys are unchanged in version 2
+def migrate_v1(config):
+    return config
+
+# Migration from each version to the next
+MIGRATIONS = {
+    1: migrate_v1,
+}
+
+def migrate(config):
+    version = config.pop('config_version', 1)
+    while version < CONFIG_VERSION and version in MIGRATIONS:
+        config = MIGRATIONS[version](config)
+        version += 1
+    return config
+
+def is_key(value):
+    return isinstance(value, str) and bool(value)
+
+def is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+# Event hook types and the key each one needs
+HOOK_FIELDS = {'script': 'command', 'file': 'path', 'webhook': 'url'}
+
+def is_hook_list(value):
+    return isinstance(value, list) and all(
+        isinstance(hook, dict) and hook.get('type') in HOOK_FIELDS and bool(hook.get(HOOK_FIELDS[hook['type']]))
+        and hook.get('policy', 'drop') in ('drop', 'coalesce') for hook in value)
+
+def is_alarm_list(value):
+    return isinstance(value, list) and all(
+        isinstance(alarm, dict) and isinstance(alarm.get('name', ''), str)
+        and (alarm.get('timer') is None or is_key(alarm['timer']))
+        and is_number(alarm.get('at')) and alarm['at'] >= 0
+        and is_number(alarm.get('repeat', 0)) and alarm.get('repeat', 0) >= 0
+        and alarm.get('alert', 'flash') in ('flash', 'sound', 'both') for alarm in value)
+
+# Each timer entry overrides top-level keys, so its values must pass the same validators
+def is_timer_list(value):
+    return isinstance(value, list) and all(
+        isinstance(timer, dict) and is_key(timer.get('name')) and all(
+            key != 'timers' and VALIDATORS.get(key, lambda item: True)(item) for key, item in timer.items())
+        for timer in value)
+
+# Validator for each known key; loaded values failing it fall back to the default
+VALIDATORS = {
+    'start_key': is_binding,
+    'stop_key': is_binding,
+    'kill_key': lambda value: value is None or is_binding(value),
+    'split_key': lambda value: value is None or is_binding(value),
+    'color': is_key,
+    'font': is_key,
+    'font_size': lambda value: is_int(value) and value > 0,
+    'position': is_key,
+    'screen_index': lambda value: is_int(value) and value >= 0,
+    'mirror_screens': lambda value: isinstance(value, list) and all(is_int(index) and index >= 0 for index in value),
+    'offset_x': is_int,
+    'offset_y': is_int,
+    'resolution': lambda value: value in ('seconds', 'tenths', 'milliseconds'),
+    'mode': lambda value: value in ('stopwatch', 'countdown'),
+    'duration': lambda value: is_number(value) and value >= 0,
+    'timers': is_timer_list,
+    'thresholds': lambda value: isinstance(value, list) and all(is_number(item) and item >= 0 for item in value),
+    'event_hooks': is_hook_list,
+    'alarms': is_alarm_list,
+    'hotkey_backend': lambda value: value in ('keyboard', 'evdev', 'fake'),
+}
 
 class ConfigManager:
     def __init__(self, config_file='config.json'):
         self.config_file = config_file
-    
-    # Load configuration from file if it exists
+        self.last_written = None
+        self.writer = DebouncedWriter(self.write_atomic)
+
+    # Path of a data file kept in the same folder as the config file
+    def data_path(self, filename):
+        return os.path.join(os.path.dirname(os.path.abspath(self.config_file)), filename)
+
+    # Load configuration from file if it exists, keeping defaults for missing or invalid keys
     def load_config(self):
-        if os.path.exists(self.config_file):
+        return self.validate(self.read_config_file())
+
+    # Parse the config file; returns None when it is missing or unreadable
+    def read_config_file(self):
+        try:
             with open(self.config_file, 'r') as f:
                 loaded_config = json.load(f)
-            default_config = self.get_default_config()
-            default_config.update(loaded_config)
-            return default_config
-        else:
-            return self.get_default_config()
-        
-    # Save the provided configuration to the config file
+        except (OSError, ValueError):
+            return None
+        return loaded_config if isinstance(loaded_config, dict) else None
+
+    # Migrate a loaded config and merge it key by key over the defaults, or over a given base config
+    def validate(self, loaded_config, base_config=None):
+        config = dict(base_config) if base_config is not None else self.get_default_config()
+        if loaded_config is None:
+            return config
+        for key, value in migrate(dict(loaded_config)).items():
+            validator = VALIDATORS.get(key)
+            if validator is None or validator(value):
+                config[key] = value
+        return config
+
+    # Schedule the provided configuration to be written off the calling thread; rapid saves cost one write
     def save_config(self, config):
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f)
-    
+        self.writer.save(json.dumps({**config, 'config_version': CONFIG_VERSION}))
+
+    # Write any pending save now
+    def flush(self):
+        self.writer.flush()
+
+    # Replace the config file atomically and remember the text, so the watcher can skip our own saves
+    def write_atomic(self, data):
+        write_atomic(self.config_file, data, prefix='.config-')
+        self.last_written = data
+
     # Return a dictionary with default configuration values
     def get_default_config(self):
         return {
             'start_key': 'F1',
             'stop_key': 'F2',
             'kill_key': 'F3',
+            'split_key': None,
             'color': 'green',
             'position': 'top_right',
-            'screen_index': 0
-        }
\ No newline at end of file
+            'screen_index': 0,
+            'mirror_screens': [],
+            'offset_x': 0,
+            'offset_y': 0,
+            'resolution': 'seconds',
+            'mode': 'stopwatch',
+            'duration': 0,
+            'timers': [],
+            'thresholds': [],
+            'event_hooks': [],
+            'alarms': [],
+            'hotkey_backend': 'keyboard'
+        }
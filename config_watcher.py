@@ -0,0 +1,79 @@
+import json
+import os
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+from config_manager import changed_keys
+
+# Milliseconds to wait after the last file event, so an editor's save burst is read once
+RELOAD_DELAY = 300
+
+class ConfigWatcher(QObject):
+    # Emitted with the merged config when the file was changed by someone else
+    config_changed = Signal(dict)
+
+    # Watch the config file, and its folder so files replaced by rename are noticed too
+    def __init__(self, config_manager, config, parent=None):
+        super().__init__(parent)
+        self.config_manager = config_manager
+        self.config = dict(config)
+        self.path = os.path.abspath(config_manager.config_file)
+        self.signature = self.file_signature()
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.addPath(os.path.dirname(self.path))
+        self.watch_file()
+        self.watcher.fileChanged.connect(self.schedule_reload)
+        self.watcher.directoryChanged.connect(self.directory_changed)
+
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(RELOAD_DELAY)
+        self.reload_timer.timeout.connect(self.reload)
+
+    # Editors often replace the file, which drops it from the watch list
+    def watch_file(self):
+        if os.path.exists(self.path) and self.path not in self.watcher.files():
+            self.watcher.addPath(self.path)
+
+    # Identity, modification time and size of the config file; None while it does not exist
+    def file_signature(self):
+        try:
+            info = os.stat(self.path)
+        except OSError:
+            return None
+        return info.st_ino, info.st_mtime_ns, info.st_size
+
+    # The folder also changes for sibling files (history, splits, checkpoint); only react when
+    # the config file itself was created, replaced or removed
+    def directory_changed(self, path=None):
+        signature = self.file_signature()
+        if signature != self.signature:
+            self.signature = signature
+            self.schedule_reload()
+
+    def schedule_reload(self, path=None):
+        self.reload_timer.start()
+
+    # Track the config the application is running with, so only real changes are emitted
+    def set_config(self, config):
+        self.config = dict(config)
+
+    def reload(self):
+        self.watch_file()
+        try:
+            with open(self.path, 'r') as f:
+                data = f.read()
+        except OSError:
+            return
+        # Our own saves write exactly this text
+        if data == self.config_manager.last_written:
+            return
+        try:
+            loaded_config = json.loads(data)
+        except ValueError:
+            return
+        if not isinstance(loaded_config, dict):
+            return
+        # Invalid values keep what is running now instead of falling back to defaults
+        new_config = self.config_manager.validate(loaded_config, self.config)
+        if changed_keys(self.config, new_config):
+            self.config = new_config
+            self.config_changed.emit(new_config)
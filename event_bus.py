@@ -0,0 +1,131 @@
+import collections
+import sys
+import threading
+import time
+import traceback
+
+# Worker threads shared by all subscribers
+WORKERS = 4
+# Events each subscriber may have waiting before its policy applies
+QUEUE_SIZE = 16
+
+# What happens to an event published while a subscriber's queue is full
+DROP = 'drop'
+# Keep only the latest waiting event of each type, so a slow subscriber sees current state
+COALESCE = 'coalesce'
+
+# Timer events published on the bus
+EVENTS = ('start', 'stop', 'split', 'reset', 'threshold', 'alarm')
+
+class Subscription:
+    def __init__(self, handler, events, policy, queue_size):
+        self.handler = handler
+        self.events = set(events) if events else None
+        self.policy = policy
+        self.queue_size = queue_size
+        self.pending = collections.OrderedDict() if policy == COALESCE else collections.deque()
+        # True while the subscription sits in the ready queue or a worker runs it
+        self.scheduled = False
+        self.dropped = 0
+        self.delivered = 0
+
+    # Called with the bus lock held; returns False if the event was dropped
+    def offer(self, event):
+        if self.policy == COALESCE:
+            self.pending.pop(event['event'], None)
+            self.pending[event['event']] = event
+            return True
+        if len(self.pending) >= self.queue_size:
+            self.dropped += 1
+            return False
+        self.pending.append(event)
+        return True
+
+    def take(self):
+        if self.policy == COALESCE:
+            return self.pending.popitem(last=False)[1]
+        return self.pending.popleft()
+
+class EventBus:
+    # Deliver timer events to subscribers on a small worker pool. Publishing only appends to a
+    # bounded per-subscriber queue, so a slow subscriber never delays a tick or a hotkey; it only
+    # loses (DROP) or merges (COALESCE) its own events. A subscription runs on one worker at a time.
+    def __init__(self, workers=WORKERS):
+        self.lock = threading.Lock()
+        self.ready = collections.deque()
+        self.wakeup = threading.Condition(self.lock)
+        self.subscriptions = []
+        self.running = True
+        self.threads = [threading.Thread(target=self.work, name=f"event-bus-{i}", daemon=True) for i in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    # handler(event) is called on a worker thread with a dict holding 'event', 'time' and the payload
+    def subscribe(self, handler, events=None, policy=DROP, queue_size=QUEUE_SIZE):
+        subscription = Subscription(handler, events, policy, queue_size)
+        with self.lock:
+            self.subscriptions = self.subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions = [item for item in self.subscriptions if item is not subscription]
+            subscription.pending.clear()
+
+    def clear(self):
+        with self.lock:
+            for subscription in self.subscriptions:
+                subscription.pending.clear()
+            self.subscriptions = []
+
+    # Never blocks on a subscriber: queue the event for each interested one and wake a worker
+    def publish(self, event_type, payload=None):
+        if not self.subscriptions:
+            return
+        event = {'event': event_type, 'time': time.time(), **(payload or {})}
+        with self.lock:
+            for subscription in self.subscriptions:
+                if subscription.events is not None and event_type not in subscription.events:
+                    continue
+                if subscription.offer(event) and not subscription.scheduled:
+                    subscription.scheduled = True
+                    self.ready.append(subscription)
+                    self.wakeup.notify()
+
+    def work(self):
+        while True:
+            with self.lock:
+                while self.running and not self.ready:
+                    self.wakeup.wait()
+                if not self.running:
+                    return
+                subscription = self.ready.popleft()
+                if not subscription.pending:
+                    subscription.scheduled = False
+                    continue
+                event = subscription.take()
+            try:
+                subscription.handler(event)
+            except Exception:
+                print(f"event handler failed for {event['event']!r}:", file=sys.stderr)
+                traceback.print_exc()
+            with self.lock:
+                subscription.delivered += 1
+                # Requeue behind the other ready subscribers so one busy subscriber cannot hog a worker
+                if subscription.pending:
+                    self.ready.append(subscription)
+                    self.wakeup.notify()
+                else:
+                    subscription.scheduled = False
+
+    # Tell the workers to stop. By default this returns at once: the workers are daemon threads, and a
+    # hung script or webhook must not hold up quitting. A timeout caps the total wait for all of them.
+    def close(self, timeout=0.0):
+        with self.lock:
+            self.running = False
+            self.wakeup.notify_all()
+        if timeout <= 0:
+            return
+        deadline = time.monotonic() + timeout
+        for thread in self.threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import urllib.request
+from config_manager import changed_keys
+from event_bus import DROP, COALESCE
+from timer_core import format_elapsed
+from utils import write_atomic
+
+# Seconds a script or webhook may take before it is abandoned
+HOOK_TIMEOUT = 5.0
+
+# Run a command with the event in environment variables; it runs on a bus worker, never the GUI thread
+class ScriptHook:
+    def __init__(self, command):
+        self.command = command
+
+    def __call__(self, event):
+        env = dict(os.environ)
+        env.update({f"TIMER_{key.upper()}": str(value) for key, value in event.items()})
+        subprocess.run(self.command, shell=isinstance(self.command, str), env=env,
+                       timeout=HOOK_TIMEOUT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+# Write the formatted time to a text file, e.g. for an OBS "read from file" text source
+class TextFileHook:
+    def __init__(self, path, template='{elapsed_text}'):
+        self.path = path
+        self.template = template
+
+    def __call__(self, event):
+        text = self.template.format(elapsed_text=format_elapsed(event.get('elapsed', 0.0)), **event)
+        # Replace the file in one step so OBS never reads a half-written one; it is rewritten on
+        # every event, so it is not worth an fsync
+        write_atomic(self.path, text, prefix='.hook-', sync=False)
+
+# POST the event as JSON to a URL
+class WebhookHook:
+    def __init__(self, url):
+        self.url = url
+
+    def __call__(self, event):
+        request = urllib.request.Request(self.url, data=json.dumps(event).encode(),
+                                         headers={'Content-Type': 'application/json'}, method='POST')
+        with urllib.request.urlopen(request, timeout=HOOK_TIMEOUT) as response:
+            response.read()
+
+def create_hook(entry):
+    if entry['type'] == 'script':
+        return ScriptHook(entry['command'])
+    if entry['type'] == 'file':
+        return TextFileHook(entry['path'], entry.get('template', '{elapsed_text}'))
+    return WebhookHook(entry['url'])
+
+class EventHooks:
+    # Config keys the hooks depend on
+    CONFIG_KEYS = {'event_hooks'}
+
+    # Subscribe one handler per entry of config['event_hooks'] to the bus
+    def __init__(self, bus, config):
+        self.bus = bus
+        self.config = dict(config)
+        self.subscriptions = []
+        self.subscribe_hooks()
+
+    def update_config(self, new_config):
+        changed = changed_keys(self.config, new_config) & self.CONFIG_KEYS
+        self.config = dict(new_config)
+        if changed:
+            self.subscribe_hooks()
+
+    def subscribe_hooks(self):
+        for subscription in self.subscriptions:
+            self.bus.unsubscribe(subscription)
+        self.subscriptions = []
+        for entry in self.config.get('event_hooks', []):
+            # Files only ever need the latest value; scripts and webhooks default to dropping overflow
+            default_policy = COALESCE if entry['type'] == 'file' else DROP
+            self.subscriptions.append(self.bus.subscribe(create_hook(entry), entry.get('events'),
+                                                         entry.get('policy', default_policy)))
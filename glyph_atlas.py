@@ -0,0 +1,45 @@
+from PySide6.QtCore import Qt, QRect
+from PySide6.QtGui import QColor, QFontMetrics, QPainter, QPixmap
+
+# Every character the time display can show
+GLYPHS = '0123456789:.+- '
+
+class GlyphAtlas:
+    # Pre-render every glyph into equal-width cells of a single pixmap
+    def __init__(self, font, color, device_pixel_ratio=1.0):
+        self.key = (font.key(), color, device_pixel_ratio)
+        self.device_pixel_ratio = device_pixel_ratio
+        metrics = QFontMetrics(font)
+        self.cell_width = max(metrics.horizontalAdvance(glyph) for glyph in GLYPHS)
+        self.cell_height = metrics.height()
+
+        self.pixmap = QPixmap(round(self.cell_width * len(GLYPHS) * device_pixel_ratio),
+                              round(self.cell_height * device_pixel_ratio))
+        self.pixmap.setDevicePixelRatio(device_pixel_ratio)
+        self.pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(self.pixmap)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        painter.setFont(font)
+        painter.setPen(QColor(color))
+        for index, glyph in enumerate(GLYPHS):
+            cell = QRect(index * self.cell_width, 0, self.cell_width, self.cell_height)
+            painter.drawText(cell, Qt.AlignmentFlag.AlignCenter, glyph)
+        painter.end()
+
+        # Source rectangles are in device pixels of the pixmap
+        self.sources = {}
+        for index, glyph in enumerate(GLYPHS):
+            self.sources[glyph] = QRect(round(index * self.cell_width * device_pixel_ratio), 0,
+                                        round(self.cell_width * device_pixel_ratio),
+                                        round(self.cell_height * device_pixel_ratio))
+
+    # Check whether the atlas was built for the given style inputs
+    def matches(self, font, color, device_pixel_ratio):
+        return self.key == (font.key(), color, device_pixel_ratio)
+
+    # Draw one glyph with its cell's top-left corner at (x, y)
+    def draw(self, painter, x, y, glyph):
+        source = self.sources.get(glyph)
+        if source is not None:
+            painter.drawPixmap(QRect(x, y, self.cell_width, self.cell_height), self.pixmap, source)
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import os
+import signal
+import stat
+import sys
+import threading
+import time
+from config_manager import ConfigManager
+from checkpoint import Checkpoint
+from timer_core import TimerCore, timer_configs, next_wakeup, MAIN_TIMER
+
+# Headless mode: the timers without Qt, driven from an asyncio loop. Nothing here may import Qt.
+
+# Commands read one per line from stdin or socket clients, optionally followed by a timer name
+COMMANDS = ('start', 'stop', 'split', 'reset', 'quit')
+# Bytes a socket client may fall behind before it is disconnected, so a stalled reader cannot grow memory
+CLIENT_BUFFER = 1 << 20
+
+class HeadlessTimers:
+    # Drive one TimerCore per configured timer with a single loop callback armed for the earliest
+    # display boundary, and stream every update as a JSON line to stdout or to the socket clients
+    def __init__(self, config, use_socket=False, clock=time.monotonic):
+        self.loop = asyncio.get_running_loop()
+        self.clock = clock
+        self.use_socket = use_socket
+        self.clients = set()
+        # Tasks serving socket clients, cancelled and awaited on shutdown
+        self.client_tasks = set()
+        self.handle = None
+        self.done = asyncio.Event()
+        # Set by the quit command; like the overlay's tray Quit it clears the checkpoint, while SIGTERM
+        # or a lost reader leave running timers to resume
+        self.clear_state = False
+        self.cores = {name: TimerCore(timer_config, name, clock, self.publish_event)
+                      for name, timer_config in timer_configs(config).items()}
+
+    # Resume timers that were running when the headless mode last stopped
+    def set_checkpoint(self, checkpoint):
+        checkpoint.retain(self.cores)
+        for core in self.cores.values():
+            core.set_checkpoint(checkpoint)
+        self.reschedule()
+
+    def write(self, record, clients=None):
+        line = json.dumps(record) + '\n'
+        if not self.use_socket:
+            try:
+                sys.stdout.write(line)
+                sys.stdout.flush()
+            except (BrokenPipeError, ValueError):
+                # The reader went away; there is nobody left to stream to
+                self.done.set()
+            return
+        data = line.encode()
+        for writer in list(self.clients if clients is None else clients):
+            if writer.transport.get_write_buffer_size() > CLIENT_BUFFER:
+                self.clients.discard(writer)
+                writer.close()
+            else:
+                writer.write(data)
+
+    def publish_time(self, core, now=None, clients=None):
+        if now is None:
+            now = self.clock()
+        self.write({'type': 'time', 'timer': core.state.name, 'text': core.text,
+                    'elapsed': core.state.elapsed(now), 'running': core.running}, clients)
+
+    def publish_event(self, event, timer_name, elapsed):
+        self.write({'type': 'event', 'event': event, 'timer': timer_name, 'elapsed': elapsed})
+
+    # Current time of every timer, to all outputs or only to a newly connected client
+    def snapshot(self, clients=None):
+        now = self.clock()
+        for core in self.cores.values():
+            self.publish_time(core, now, clients)
+
+    # Update every running timer whose boundary has passed, then re-arm once for all of them
+    def tick(self):
+        self.handle = None
+        now = self.clock()
+        for core in self.cores.values():
+            if core.running and core.next_due <= now:
+                core.update(now)
+                self.publish_time(core, now)
+        self.reschedule(now)
+
+    def reschedule(self, now=None):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        due = next_wakeup(self.cores.values())
+        if due is None:
+            return
+        if now is None:
+            now = self.clock()
+        self.handle = self.loop.call_later(max(0.0, due - now), self.tick)
+
+    # Run a command line such as "start" or "stop <timer name>"; unknown commands and timers are ignored
+    def run_command(self, line):
+        command, _, timer_name = line.strip().partition(' ')
+        if command not in COMMANDS:
+            return
+        if command == 'quit':
+            self.clear_state = True
+            self.done.set()
+            return
+        core = self.cores.get(timer_name or MAIN_TIMER)
+        if core is not None and getattr(core, command)():
+            self.publish_time(core)
+            self.reschedule()
+
+    # Reader thread: stdin has no portable asyncio reader, so lines are handed to the loop
+    def read_stdin(self):
+        for line in sys.stdin:
+            self.loop.call_soon_threadsafe(self.run_command, line)
+
+    # Socket clients get a snapshot on connect, then the stream; they may send commands too
+    async def serve_client(self, reader, writer):
+        self.client_tasks.add(asyncio.current_task())
+        self.clients.add(writer)
+        self.snapshot([writer])
+        try:
+            async for line in reader:
+                self.run_command(line.decode(errors='replace'))
+        except (ConnectionError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Shutdown ends the connection; returning normally keeps asyncio from logging the cancelled task
+            pass
+        finally:
+            self.client_tasks.discard(asyncio.current_task())
+            self.clients.discard(writer)
+            writer.close()
+
+    # Stop serving socket clients, waiting until every client task has finished
+    async def close_clients(self):
+        tasks = list(self.client_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+# A socket file left behind by a killed instance would make the bind fail
+def remove_stale_socket(path):
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+async def run(socket_path, command):
+    config_manager = ConfigManager()
+    config = config_manager.load_config()
+    timers = HeadlessTimers(config, socket_path is not None)
+    # Kept apart from the overlay's state.bin, since both may run at once
+    checkpoint = Checkpoint(config_manager.data_path('headless-state.bin'))
+    timers.set_checkpoint(checkpoint)
+    server = None
+    if socket_path is not None:
+        remove_stale_socket(socket_path)
+        server = await asyncio.start_unix_server(timers.serve_client, socket_path)
+    try:
+        timers.loop.add_signal_handler(signal.SIGTERM, timers.done.set)
+    except (NotImplementedError, AttributeError):
+        pass
+    threading.Thread(target=timers.read_stdin, name='stdin', daemon=True).start()
+    timers.snapshot()
+    if command:
+        timers.run_command(command)
+    try:
+        await timers.done.wait()
+    finally:
+        if timers.handle is not None:
+            timers.handle.cancel()
+        if server is not None:
+            server.close()
+            await timers.close_clients()
+            await server.wait_closed()
+            remove_stale_socket(socket_path)
+        if timers.clear_state:
+            checkpoint.clear_all()
+        checkpoint.close()
+
+# `python main.py --headless [--socket=PATH] [command [timer name]]`
+def main(argv):
+    socket_path = None
+    for arg in argv[1:]:
+        if arg.startswith('--socket='):
+            socket_path = arg.partition('=')[2]
+    args = [arg for arg in argv[1:] if not arg.startswith('-')]
+    command = ' '.join(args) if args and args[0] in COMMANDS else ''
+    if socket_path is not None and not hasattr(asyncio, 'start_unix_server'):
+        print("--socket needs Unix domain sockets, which this platform does not support", file=sys.stderr)
+        return 2
+    try:
+        asyncio.run(run(socket_path, command))
+    except KeyboardInterrupt:
+        pass
+    return 0
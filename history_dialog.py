@@ -0,0 +1,79 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QComboBox,
+                               QTableWidget, QTableWidgetItem, QHeaderView, QPushButton)
+from PySide6.QtGui import QIcon
+from utils import resource_path
+from timer_core import format_elapsed, MAIN_TIMER
+
+# Number of most recent days listed in the per-day table
+DAYS_SHOWN = 30
+
+class HistoryDialog(QDialog):
+    # Initialize dialog over the session history and the configured timer names
+    def __init__(self, history, config):
+        super().__init__()
+        self.history = history
+        self.config = config
+        self.setWindowTitle("History")
+        self.setWindowIcon(QIcon(resource_path("icon.ico")))
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        self.timer_combo = QComboBox()
+        self.timer_combo.currentIndexChanged.connect(self.refresh)
+        timer_layout = QHBoxLayout()
+        timer_layout.addWidget(QLabel('Timer:'))
+        timer_layout.addWidget(self.timer_combo)
+        timer_layout.addStretch()
+        layout.addLayout(timer_layout)
+
+        # Summary statistics
+        self.stat_labels = {}
+        stats_layout = QFormLayout()
+        for key, title in (('count', 'Sessions:'), ('total', 'Total:'), ('mean', 'Mean:'), ('best', 'Best:'),
+                           ('p50', 'Median:'), ('p90', '90th percentile:'), ('p99', '99th percentile:')):
+            self.stat_labels[key] = QLabel()
+            stats_layout.addRow(title, self.stat_labels[key])
+        layout.addLayout(stats_layout)
+
+        # Per-day totals
+        self.day_table = QTableWidget(0, 2)
+        self.day_table.setHorizontalHeaderLabels(['Day', 'Total'])
+        self.day_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.day_table.verticalHeader().setVisible(False)
+        layout.addWidget(self.day_table)
+
+        close_button = QPushButton('Close')
+        close_button.clicked.connect(self.accept)
+        layout.addWidget(close_button)
+        self.setLayout(layout)
+
+    # List the timers, all sessions first
+    def populate_timers(self):
+        self.timer_combo.blockSignals(True)
+        self.timer_combo.clear()
+        self.timer_combo.addItem('All timers', None)
+        self.timer_combo.addItem(MAIN_TIMER, MAIN_TIMER)
+        for timer in self.config.get('timers', []):
+            if timer.get('name'):
+                self.timer_combo.addItem(timer['name'], timer['name'])
+        self.timer_combo.blockSignals(False)
+
+    def refresh(self):
+        stats = self.history.stats(self.timer_combo.currentData())
+        self.stat_labels['count'].setText(str(stats['count']))
+        for key in ('total', 'mean', 'best', 'p50', 'p90', 'p99'):
+            self.stat_labels[key].setText(format_elapsed(stats[key], 1))
+
+        days = sorted(stats['per_day'].items(), reverse=True)[:DAYS_SHOWN]
+        self.day_table.setRowCount(len(days))
+        for row, (day, total) in enumerate(days):
+            self.day_table.setItem(row, 0, QTableWidgetItem(day.isoformat()))
+            self.day_table.setItem(row, 1, QTableWidgetItem(format_elapsed(total)))
+
+    # Reload the statistics each time the dialog is shown
+    def showEvent(self, event):
+        self.populate_timers()
+        self.refresh()
+        super().showEvent(event)
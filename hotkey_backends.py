@@ -0,0 +1,187 @@
+import glob
+import os
+import select
+import struct
+import sys
+from PySide6.QtCore import QObject, QSocketNotifier
+
+# A backend turns key names into key codes and reports (code, down) for every key event.
+# The keyboard backend calls back on its own hook thread, the evdev and fake backends on the caller's.
+
+def import_keyboard():
+    global keyboard
+    if 'keyboard' not in globals():
+        import keyboard
+    return keyboard
+
+class KeyboardBackend:
+    # Global hook of the keyboard package; works on Windows, needs root on Linux
+    def __init__(self, parent=None):
+        self.keyboard = import_keyboard()
+        self.hook = None
+
+    def key_codes(self, name):
+        return self.keyboard.key_to_scan_codes(name)
+
+    def start(self, callback):
+        self.hook = self.keyboard.hook(lambda event: callback(event.scan_code, event.event_type == 'down'))
+
+    def close(self):
+        if self.hook is not None:
+            self.keyboard.unhook(self.hook)
+            self.hook = None
+
+# Linux key codes from input-event-codes.h, by lowercase key name as Qt and the keyboard package spell them
+EVDEV_KEYS = {
+    'esc': (1,), 'escape': (1,), 'minus': (12,), '-': (12,), 'equal': (13,), '=': (13,),
+    'backspace': (14,), 'tab': (15,), 'enter': (28, 96), 'return': (28,),
+    '[': (26,), ']': (27,), ';': (39,), "'": (40,), '`': (41,), '\\': (43,), ',': (51,), '.': (52,), '/': (53,),
+    'space': (57,), 'caps lock': (58,), 'capslock': (58,), 'num lock': (69,), 'numlock': (69,),
+    'scroll lock': (70,), 'scrolllock': (70,), 'print': (99,), 'print screen': (99,), 'pause': (119,),
+    'home': (102,), 'up': (103,), 'page up': (104,), 'pgup': (104,), 'left': (105,), 'right': (106,),
+    'end': (107,), 'down': (108,), 'page down': (109,), 'pgdown': (109,),
+    'insert': (110,), 'ins': (110,), 'delete': (111,), 'del': (111,),
+    'ctrl': (29, 97), 'shift': (42, 54), 'alt': (56, 100), 'alt gr': (100,),
+    'meta': (125, 126), 'windows': (125, 126),
+    **{str((digit + 1) % 10): (digit + 2,) for digit in range(10)},
+    **{letter: (code,) for letters, first in (('qwertyuiop', 16), ('asdfghjkl', 30), ('zxcvbnm', 44))
+       for code, letter in enumerate(letters, first)},
+    **{f"f{number}": (58 + number,) for number in range(1, 11)},
+    'f11': (87,), 'f12': (88,),
+    **{f"f{number}": (170 + number,) for number in range(13, 25)},
+}
+
+# Event devices that report keys and key repeat, i.e. keyboards rather than mice or power buttons
+def keyboard_devices():
+    ev_key = 1 << 1
+    ev_rep = 1 << 20
+    devices = []
+    for path in sorted(glob.glob('/sys/class/input/event*/device/capabilities/ev')):
+        try:
+            with open(path) as f:
+                capabilities = int(f.read().strip() or '0', 16)
+        except (OSError, ValueError):
+            continue
+        if capabilities & ev_key and capabilities & ev_rep:
+            devices.append(os.path.join('/dev/input', path.split('/')[4]))
+    return devices
+
+class EvdevBackend(QObject):
+    # struct input_event: struct timeval, __u16 type, __u16 code, __s32 value
+    EVENT = struct.Struct('llHHi')
+    EV_KEY = 1
+    # Events read per os.read call
+    READ_EVENTS = 64
+
+    # Read /dev/input keyboards through one epoll set, woken by the Qt event loop instead of a thread.
+    # Needs read access to the devices, e.g. membership of the input group, but not root.
+    def __init__(self, parent=None, device_paths=None):
+        super().__init__(parent)
+        self.callback = None
+        self.epoll = select.epoll()
+        self.devices = {}
+        for path in device_paths if device_paths is not None else keyboard_devices():
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+            except OSError:
+                continue
+            self.devices[fd] = path
+            self.epoll.register(fd, select.EPOLLIN)
+        if not self.devices:
+            self.epoll.close()
+            raise OSError("no readable keyboard device in /dev/input")
+        self.notifier = QSocketNotifier(self.epoll.fileno(), QSocketNotifier.Type.Read, self)
+        self.notifier.setEnabled(False)
+        self.notifier.activated.connect(self.read_events)
+
+    def key_codes(self, name):
+        codes = EVDEV_KEYS.get(name.lower())
+        if codes is None:
+            raise ValueError(f"Key {name!r} is not mapped to any known key.")
+        return codes
+
+    def start(self, callback):
+        self.callback = callback
+        self.notifier.setEnabled(True)
+
+    # Drain every ready device without blocking and report its key events
+    def read_events(self):
+        for fd, mask in self.epoll.poll(0):
+            if mask & (select.EPOLLERR | select.EPOLLHUP):
+                self.remove_device(fd)
+                continue
+            while True:
+                try:
+                    data = os.read(fd, self.EVENT.size * self.READ_EVENTS)
+                except BlockingIOError:
+                    break
+                except OSError:
+                    self.remove_device(fd)
+                    break
+                if not data:
+                    break
+                for _, _, event_type, code, value in self.EVENT.iter_unpack(data[:len(data) - len(data) % self.EVENT.size]):
+                    # value is 1 for press, 2 for auto-repeat and 0 for release
+                    if event_type == self.EV_KEY and self.callback:
+                        self.callback(code, value != 0)
+
+    # A device was unplugged
+    def remove_device(self, fd):
+        self.devices.pop(fd, None)
+        try:
+            self.epoll.unregister(fd)
+        except OSError:
+            pass
+        os.close(fd)
+
+    def close(self):
+        self.callback = None
+        self.notifier.setEnabled(False)
+        for fd in list(self.devices):
+            self.remove_device(fd)
+        self.epoll.close()
+
+class FakeBackend:
+    # In-memory backend for tests and benchmarks; key codes are the lowercase key names
+    def __init__(self, parent=None):
+        self.callback = None
+
+    def key_codes(self, name):
+        if not name:
+            raise ValueError(f"Key {name!r} is not mapped to any known key.")
+        return (name.lower(),)
+
+    def start(self, callback):
+        self.callback = callback
+
+    def key_down(self, name):
+        if self.callback:
+            self.callback(name.lower(), True)
+
+    def key_up(self, name):
+        if self.callback:
+            self.callback(name.lower(), False)
+
+    def press(self, name):
+        self.key_down(name)
+        self.key_up(name)
+
+    def close(self):
+        self.callback = None
+
+BACKENDS = {
+    'keyboard': KeyboardBackend,
+    'evdev': EvdevBackend,
+    'fake': FakeBackend,
+}
+
+# Create the configured backend, falling back to the keyboard package when it cannot start
+def create_backend(name, parent=None):
+    backend_class = BACKENDS.get(name, KeyboardBackend)
+    try:
+        return backend_class(parent)
+    except OSError as error:
+        if backend_class is KeyboardBackend:
+            raise
+        print(f"hotkey backend {name!r} unavailable ({error}), using 'keyboard'", file=sys.stderr)
+        return KeyboardBackend(parent)
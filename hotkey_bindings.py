@@ -0,0 +1,126 @@
+import time
+
+# Bit of each modifier in a chord's modifier mask
+MODIFIERS = {'ctrl': 1, 'alt': 2, 'shift': 4, 'meta': 8}
+# Other spellings of modifier names, from Qt and the keyboard package
+MODIFIER_ALIASES = {'control': 'ctrl', 'option': 'alt', 'win': 'meta', 'windows': 'meta', 'super': 'meta', 'cmd': 'meta'}
+# Seconds allowed between the steps of a key sequence
+SEQUENCE_TIMEOUT = 1.0
+# Separator between the steps of a sequence, as QKeySequence writes it
+SEQUENCE_SEPARATOR = ', '
+
+# Parse 'F1', 'Ctrl+Shift+F1' or a sequence such as 'Ctrl+K, C' into ((modifier_mask, key), ...)
+def parse_binding(text):
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError(f"empty key binding {text!r}")
+    steps = []
+    for chord in text.split(SEQUENCE_SEPARATOR):
+        parts = [part.strip() for part in chord.strip().lower().split('+')]
+        # 'Ctrl++' and '+' bind the plus key itself; 'Ctrl+' has no key and fails below
+        if len(parts) > 1 and parts[-1] == '' and parts[-2] == '':
+            parts = parts[:-2] + ['+']
+        key = MODIFIER_ALIASES.get(parts[-1], parts[-1])
+        if not key:
+            raise ValueError(f"missing key in binding {text!r}")
+        mask = 0
+        for part in parts[:-1]:
+            bit = MODIFIERS.get(MODIFIER_ALIASES.get(part, part))
+            if bit is None:
+                raise ValueError(f"unknown modifier {part!r} in binding {text!r}")
+            mask |= bit
+        steps.append((mask, key))
+    return tuple(steps)
+
+def is_binding(value):
+    try:
+        parse_binding(value)
+    except ValueError:
+        return False
+    return True
+
+# Every hotkey in the config as (label, binding text, (action, timer name))
+def config_bindings(config):
+    bindings = [
+        ('start_key', config.get('start_key'), ('start', '')),
+        ('stop_key', config.get('stop_key'), ('stop', '')),
+        ('kill_key', config.get('kill_key'), ('kill', '')),
+        ('split_key', config.get('split_key'), ('split', '')),
+    ]
+    for timer in config.get('timers', []):
+        name = timer.get('name')
+        if name:
+            bindings.append((f"{name} start_key", timer.get('start_key'), ('start', name)))
+            bindings.append((f"{name} stop_key", timer.get('stop_key'), ('stop', name)))
+    return [binding for binding in bindings if binding[1]]
+
+class BindingTrie:
+    # Prefix trie of key sequences. Each node maps a step to its child node;
+    # a node that completes a binding holds its value under the None key.
+    def __init__(self):
+        self.root = {}
+
+    # Insert a binding; returns the value it conflicts with and 'duplicate' or 'prefix', or None
+    def add(self, steps, value):
+        node = self.root
+        for step in steps:
+            if None in node:
+                return node[None], 'prefix'
+            node = node.setdefault(step, {})
+        if None in node:
+            return node[None], 'duplicate'
+        if node:
+            return self.first_value(node), 'prefix'
+        node[None] = value
+        return None
+
+    def first_value(self, node):
+        while None not in node:
+            node = next(iter(node.values()))
+        return node[None]
+
+# Pairs of labels whose bindings are identical or where one is the start of the other, with the kind
+def find_conflicts(bindings):
+    trie = BindingTrie()
+    conflicts = []
+    for label, text in bindings:
+        try:
+            steps = parse_binding(text)
+        except ValueError:
+            conflicts.append((label, None, 'invalid'))
+            continue
+        conflict = trie.add(steps, label)
+        if conflict:
+            conflicts.append((label, *conflict))
+    return conflicts
+
+class SequenceMatcher:
+    # Walk the trie one key press at a time; each press costs one or two dict lookups
+    def __init__(self, trie, timeout=SEQUENCE_TIMEOUT, clock=time.monotonic):
+        self.trie = trie
+        self.timeout = timeout
+        self.clock = clock
+        self.node = trie.root
+        self.last_step = 0.0
+
+    def reset(self):
+        self.node = self.trie.root
+
+    # Advance with one (modifier_mask, key) press; returns the value of a completed binding or None
+    def feed(self, step):
+        root = self.trie.root
+        now = self.clock()
+        if self.node is not root and now - self.last_step > self.timeout:
+            self.node = root
+        self.last_step = now
+        child = self.node.get(step)
+        # A press that breaks a sequence may still start a new one
+        if child is None and self.node is not root:
+            child = root.get(step)
+        if child is None:
+            self.node = root
+            return None
+        if None in child:
+            self.node = root
+            return child[None]
+        self.node = child
+        return None
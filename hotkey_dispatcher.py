@@ -0,0 +1,70 @@
+import threading
+from PySide6.QtCore import QObject, Qt, Signal
+
+# Actions where pressing twice has the same effect as pressing once
+IDEMPOTENT_ACTIONS = {'start', 'stop'}
+
+class HotkeyDispatcher(QObject):
+    # Queued wakeup for the GUI thread; at most one is in flight at a time
+    flush_requested = Signal()
+    # Emitted on the GUI thread for every accepted press: action and timer name
+    action_triggered = Signal(str, str)
+
+    # Filter key events on the hook thread and hand accepted presses to the GUI thread in batches
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.lock = threading.Lock()
+        self.pending = []
+        self.flush_posted = False
+        self.held = set()
+        self.enabled = True
+        self.repeats_dropped = 0
+        self.disabled_dropped = 0
+        self.wakeups = 0
+        self.flush_requested.connect(self.flush, Qt.ConnectionType.QueuedConnection)
+
+    # Called on the hook thread for every key event. Returns True for a fresh press,
+    # False for a release or an auto-repeat.
+    def key_event(self, key, down):
+        if not down:
+            self.held.discard(key)
+            return False
+        # OS auto-repeat sends further downs without an up in between
+        if key in self.held:
+            self.repeats_dropped += 1
+            return False
+        self.held.add(key)
+        return True
+
+    # Called on the hook thread. Returns True if the action was queued for the GUI thread.
+    def post(self, action, timer_name=''):
+        if not self.enabled:
+            self.disabled_dropped += 1
+            return False
+        with self.lock:
+            self.pending.append((action, timer_name))
+            post = not self.flush_posted
+            self.flush_posted = True
+        if post:
+            self.flush_requested.emit()
+        return True
+
+    # Called on the GUI thread: run everything queued since the last wakeup
+    def flush(self):
+        with self.lock:
+            batch, self.pending = self.pending, []
+            self.flush_posted = False
+        self.wakeups += 1
+        previous = None
+        for item in batch:
+            # Back-to-back duplicates of an idempotent action within one poll collapse into one
+            if item != previous or item[0] not in IDEMPOTENT_ACTIONS:
+                self.action_triggered.emit(*item)
+            previous = item
+
+    # Drop presses on the hook side so nothing crosses threads while disabled
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if not enabled:
+            with self.lock:
+                self.pending = []
@@ -1,73 +1,181 @@
 from PySide6.QtCore import QObject, Signal
-from multiprocessing import Process, Event
+from config_manager import changed_keys
+from hotkey_dispatcher import HotkeyDispatcher
+from hotkey_backends import create_backend
+from hotkey_bindings import MODIFIERS, BindingTrie, SequenceMatcher, config_bindings, parse_binding
 import os
 import signal
+import sys
+import threading
 
-def import_keyboard():
-    global keyboard
-    if 'keyboard' not in globals():
-        import keyboard
-    return keyboard
+# Seconds to wait for a graceful quit after the kill key before forcing it
+KILL_TIMEOUT = 2.0
 
-def kill_process(pid, exit_event, kill_key):
-    keyboard = import_keyboard()
-    while not exit_event.is_set():
-        if keyboard.is_pressed(kill_key):
-            os.kill(pid, signal.SIGTERM)
-            exit_event.set()
+# Key names tried for each modifier, as the backends spell them
+MODIFIER_KEYS = {'ctrl': ('ctrl',), 'alt': ('alt',), 'shift': ('shift',), 'meta': ('meta', 'windows')}
+
+# Terminate the current process if a graceful shutdown did not finish in time
+def force_kill(pid):
+    os.kill(pid, signal.SIGTERM)
 
 class HotkeyHandler(QObject):
     start_signal = Signal()
     stop_signal = Signal()
+    kill_signal = Signal()
+    split_signal = Signal()
+    # Start and stop for the additional timers in config['timers'], carrying the timer name
+    timer_start_signal = Signal(str)
+    timer_stop_signal = Signal(str)
+
+    # Config keys that require the key bindings to be rebuilt
+    CONFIG_KEYS = {'start_key', 'stop_key', 'kill_key', 'split_key', 'timers', 'hotkey_backend'}
 
     # Initialize handler with given config
     def __init__(self, config):
         super().__init__()
-        self.config = config
-        self.kill_process = None
-        self.exit_event = Event()
-        self.keyboard = import_keyboard()
-        self.hotkeys_active = True
+        self.config = dict(config)
+        self.kill_timer = None
+        # Optional LatencyTracker timestamped on the hook thread for each start/stop press
+        self.latency = None
+        self.dispatcher = HotkeyDispatcher(self)
+        self.dispatcher.action_triggered.connect(self.dispatch)
+        self.key_tokens = {}
+        self.modifier_bits = {}
+        self.held_modifiers = {}
+        self.modifier_mask = 0
+        self.matcher = SequenceMatcher(BindingTrie())
+        self.backend = None
         self.setup_hotkeys()
 
+    @property
+    def hotkeys_active(self):
+        return self.dispatcher.enabled
+
+    # Compile every configured binding into one trie, starting the configured backend if needed
     def setup_hotkeys(self):
-        # Set up keyboard hooks for start and stop keys
-        self.keyboard.on_press_key(self.config['start_key'], self.emit_start, suppress=False)
-        self.keyboard.on_press_key(self.config['stop_key'], self.emit_stop, suppress=False)
-        
-        if 'kill_key' in self.config:
-            self.kill_process = Process(target=kill_process, args=(os.getpid(), self.exit_event, self.config['kill_key']))
-            self.kill_process.start()
-
-    def emit_start(self, e):
-        if self.hotkeys_active:
-            self.start_signal.emit()
+        started = self.backend is not None
+        if not started:
+            self.backend = create_backend(self.config.get('hotkey_backend', 'keyboard'), self)
+        trie = BindingTrie()
+        key_tokens = {}
+        for label, text, value in config_bindings(self.config):
+            try:
+                steps = tuple((mask, self.key_token(key_tokens, key)) for mask, key in parse_binding(text))
+            except ValueError as error:
+                # The key cannot be hooked, so the user is told the binding does nothing
+                print(f"hotkey {label} {text!r} is inactive: {error}", file=sys.stderr)
+                continue
+            # A binding that clashes with an earlier one is skipped, as the settings dialog reports it
+            trie.add(steps, value)
+
+        modifier_bits = {}
+        for name, key_names in MODIFIER_KEYS.items():
+            for key_name in key_names:
+                try:
+                    key_codes = self.backend.key_codes(key_name)
+                except ValueError:
+                    continue
+                for key_code in key_codes:
+                    modifier_bits[key_code] = MODIFIERS[name]
+                break
+
+        # Each map is swapped in one assignment, so the backend thread never sees a half-built one
+        self.key_tokens = key_tokens
+        self.modifier_bits = modifier_bits
+        self.matcher = SequenceMatcher(trie)
+        if not started:
+            self.backend.start(self.on_key_event)
+
+    # Every key code of a key name maps to one token, the lowest code, so aliases match each other
+    def key_token(self, key_tokens, key):
+        key_codes = self.backend.key_codes(key)
+        token = min(key_codes)
+        for key_code in key_codes:
+            key_tokens.setdefault(key_code, token)
+        return key_tokens[key_codes[0]]
 
-    def emit_stop(self, e):
-        if self.hotkeys_active:
+    # Runs on the backend's thread for every key event
+    def on_key_event(self, key_code, down):
+        bit = self.modifier_bits.get(key_code)
+        if not down:
+            if bit and self.held_modifiers.pop(key_code, None):
+                self.modifier_mask = self.combined_mask()
+            self.dispatcher.key_event(key_code, False)
+            return
+        if not self.dispatcher.key_event(key_code, True):
+            return
+        mask = self.modifier_mask
+        if bit:
+            self.held_modifiers[key_code] = bit
+            self.modifier_mask = self.combined_mask()
+        token = self.key_tokens.get(key_code)
+        if token is None:
+            # Modifiers lead into a chord; any other unbound key breaks a pending sequence
+            if not bit:
+                self.matcher.reset()
+            return
+        binding = self.matcher.feed((mask, token))
+        if binding is None:
+            return
+        action, timer_name = binding
+        if action == 'kill':
+            self.emit_kill()
+        else:
+            # Stamp the press before posting: once posted, the GUI thread may apply it at any moment
+            if self.latency:
+                self.latency.key_pressed()
+            self.dispatcher.post(action, timer_name)
+
+    def combined_mask(self):
+        mask = 0
+        for bit in self.held_modifiers.values():
+            mask |= bit
+        return mask
+
+    # Runs on the GUI thread for each press the dispatcher let through
+    def dispatch(self, action, timer_name):
+        if timer_name:
+            signal = self.timer_start_signal if action == 'start' else self.timer_stop_signal
+            signal.emit(timer_name)
+        elif action == 'start':
+            self.start_signal.emit()
+        elif action == 'stop':
             self.stop_signal.emit()
+        elif action == 'split':
+            self.split_signal.emit()
 
-    # Update hotkey configuration
+    # Ask the application to quit, and force it if the GUI thread does not respond
+    def emit_kill(self):
+        if self.kill_timer is not None:
+            return
+        self.kill_timer = threading.Timer(KILL_TIMEOUT, force_kill, args=(os.getpid(),))
+        self.kill_timer.daemon = True
+        self.kill_timer.start()
+        self.kill_signal.emit()
+
+    # Update hotkey configuration, rebuilding bindings only when a hotkey changed
     def update_config(self, new_config):
-        self.keyboard.unhook_all()
-        if self.kill_process:
-            self.exit_event.set()
-            self.kill_process.join()
-        self.config = new_config
-        self.exit_event.clear()
+        changed = changed_keys(self.config, new_config) & self.CONFIG_KEYS
+        self.config = dict(new_config)
+        if 'hotkey_backend' in changed:
+            self.close()
+        if changed:
+            self.rebuild_hotkeys()
+
+    # Recompile the bindings; the running backend keeps its hook or devices open
+    def rebuild_hotkeys(self):
         self.setup_hotkeys()
 
     # Disable hotkey functionality
     def disable_hotkeys(self):
-        self.hotkeys_active = False
+        self.dispatcher.set_enabled(False)
 
      # Enable hotkey functionality
     def enable_hotkeys(self):
-        self.hotkeys_active = True
-
-    # Clean up resources on object destruction
-    def __del__(self):
-        self.keyboard.unhook_all()
-        if self.kill_process:
-            self.exit_event.set()
-            self.kill_process.join()
\ No newline at end of file
+        self.dispatcher.set_enabled(True)
+
+    # Stop receiving key events
+    def close(self):
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
\ No newline at end of file
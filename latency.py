@@ -0,0 +1,112 @@
+import json
+import time
+from array import array
+from PySide6.QtCore import QObject, QEvent
+
+# Histogram buckets: bucket i counts latencies below 2**i microseconds, the last one everything above
+BUCKET_COUNT = 22
+
+class LatencyHistogram:
+    # Fixed power-of-two buckets in a preallocated array; adding a sample allocates nothing
+    __slots__ = ('name', 'counts', 'count', 'total_us', 'max_us')
+
+    def __init__(self, name):
+        self.name = name
+        self.counts = array('Q', bytes(8 * BUCKET_COUNT))
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def add(self, seconds):
+        micros = max(0, int(seconds * 1000000))
+        self.counts[min(micros.bit_length(), BUCKET_COUNT - 1)] += 1
+        self.count += 1
+        self.total_us += micros
+        if micros > self.max_us:
+            self.max_us = micros
+
+    # Upper bound in microseconds of the bucket holding the given fraction of samples
+    def percentile(self, fraction):
+        if not self.count:
+            return 0
+        wanted = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= wanted:
+                return min(2 ** index, self.max_us)
+        return self.max_us
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean_us': self.total_us / self.count if self.count else 0,
+            'p50_us': self.percentile(0.5),
+            'p99_us': self.percentile(0.99),
+            'max_us': self.max_us,
+            'bucket_upper_bounds_us': [2 ** index for index in range(BUCKET_COUNT - 1)] + [None],
+            'counts': self.counts.tolist(),
+        }
+
+class LatencyTracker(QObject):
+    # Stages from a key press on the hook thread to the next paint of the affected overlay
+    STAGES = ('queue', 'apply', 'paint', 'total')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.histograms = {stage: LatencyHistogram(stage) for stage in self.STAGES}
+        self.queue = self.histograms['queue']
+        self.apply = self.histograms['apply']
+        self.paint = self.histograms['paint']
+        self.total = self.histograms['total']
+        self.pressed_at = 0.0
+        self.received_at = 0.0
+        self.applied_at = 0.0
+        self.widget = None
+
+    # Called on the keyboard hook thread just before the signal crosses to the GUI thread
+    def key_pressed(self):
+        self.pressed_at = time.perf_counter()
+
+    # Called in the GUI thread slot before the timer action runs
+    def received(self):
+        self.received_at = time.perf_counter()
+        self.queue.add(self.received_at - self.pressed_at)
+
+    # Called after the timer action ran; the next paint of the widget closes the measurement
+    def applied(self, widget):
+        self.applied_at = time.perf_counter()
+        self.apply.add(self.applied_at - self.received_at)
+        self.watch(widget)
+
+    # The action changed nothing, so there is no paint to wait for
+    def discard(self):
+        self.watch(None)
+
+    # Wait for the next paint of the given widget, dropping any earlier wait
+    def watch(self, widget):
+        if self.widget is not None:
+            self.widget.removeEventFilter(self)
+        self.widget = widget
+        if widget is not None:
+            widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self.widget and event.type() == QEvent.Type.Paint:
+            painted_at = time.perf_counter()
+            self.paint.add(painted_at - self.applied_at)
+            self.total.add(painted_at - self.pressed_at)
+            self.widget.removeEventFilter(self)
+            self.widget = None
+        return False
+
+    # One-line summary of key-press-to-paint latency, for the tray tooltip
+    def summary(self):
+        if not self.total.count:
+            return "no hotkey presses measured"
+        return (f"hotkey to paint p50 {self.total.percentile(0.5) / 1000:.1f} ms, "
+                f"p99 {self.total.percentile(0.99) / 1000:.1f} ms ({self.total.count} presses)")
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump({stage: histogram.to_dict() for stage, histogram in self.histograms.items()}, f, indent=2)
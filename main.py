@@ -1,51 +1,134 @@
+import time
+STARTUP_ORIGIN = time.perf_counter()
+
 import sys
-import os
-import tempfile
-from PySide6.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QMessageBox
+
+# The headless mode never loads Qt, so it is dispatched before any Qt import
+if __name__ == '__main__' and '--headless' in sys.argv:
+    from headless import main
+    sys.exit(main(sys.argv))
+
+import getpass
+from PySide6.QtWidgets import QApplication, QSystemTrayIcon, QMenu
 from PySide6.QtGui import QIcon
-from PySide6.QtCore import QTimer, QObject, Signal
-from timer_widget import TimerWidget
+from PySide6.QtCore import QTimer, QObject, QEvent, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+from timer_pool import TimerPool
 from config_manager import ConfigManager
 from utils import resource_path
-from settings_dialog import SettingsDialog
-import psutil
-from hotkeyhandler import HotkeyHandler, import_keyboard
-
-class SingleInstance:
-    def __init__(self):
-        self.lockfile = os.path.normpath(tempfile.gettempdir() + '/timer.lock')
-
-    # Checks for existing instance using a lock file
-    def already_running(self):
-        try:
-            if os.path.exists(self.lockfile):
-                with open(self.lockfile, 'r') as f:
-                    pid = int(f.read())
-                if psutil.pid_exists(pid):
-                    return True
-            with open(self.lockfile, 'w') as f:
-                f.write(str(os.getpid()))
-            return False
-        except:
+from startup_profile import StartupProfile
+
+# Modules only needed after the first frame (settings_dialog, hotkeyhandler, keyboard, session_history,
+# splits, checkpoint, event_bus, alarms, latency) are imported where they are first used, all of them
+# once the overlays have been shown
+
+# Commands a second invocation forwards to the running instance, e.g. `python main.py start`
+# or `python main.py start <timer name>`
+COMMANDS = ('start', 'stop', 'split', 'reset', 'settings', 'quit')
+# Command forwarded when a second instance is launched without one
+DEFAULT_COMMAND = 'settings'
+# Commands that start the overlay when no instance is running; the others only make sense for a running one
+LAUNCH_COMMANDS = (None, 'start', 'settings')
+# Milliseconds to wait on the local socket; a live instance answers well within this
+SOCKET_TIMEOUT = 100
+
+class SingleInstance(QObject):
+    command_received = Signal(str, str)
+
+    def __init__(self, name=None):
+        super().__init__()
+        self.name = name or f"Timer-{getpass.getuser()}"
+        self.server = None
+
+    # Send a command to the running instance; returns False if no instance is listening
+    def forward(self, command, timer_name=''):
+        socket = QLocalSocket()
+        socket.connectToServer(self.name)
+        if not socket.waitForConnected(SOCKET_TIMEOUT):
             return False
+        socket.write(f"{command} {timer_name}".strip().encode() + b'\n')
+        socket.waitForBytesWritten(SOCKET_TIMEOUT)
+        socket.disconnectFromServer()
+        return True
+
+    # Claim the instance name; returns False if another live instance already owns it
+    def listen(self):
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        if not self.server.listen(self.name):
+            probe = QLocalSocket()
+            probe.connectToServer(self.name)
+            if probe.waitForConnected(SOCKET_TIMEOUT):
+                probe.disconnectFromServer()
+                return False
+            # Nobody answered, so the socket was left behind by an instance that was killed
+            QLocalServer.removeServer(self.name)
+            if not self.server.listen(self.name):
+                return False
+        self.server.newConnection.connect(self.accept_connections)
+        return True
+
+    def accept_connections(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self.read_commands(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def read_commands(self, socket):
+        while socket.canReadLine():
+            command, _, timer_name = bytes(socket.readLine()).decode(errors='replace').strip().partition(' ')
+            if command in COMMANDS:
+                self.command_received.emit(command, timer_name)
+
+    def close(self):
+        if self.server:
+            self.server.close()
 
 class TimerApp(QApplication):
     def __init__(self, argv):
         super().__init__(argv)
-        # Check for single instance
+        self.profile = StartupProfile('--profile-startup' in argv, STARTUP_ORIGIN)
+        self.profile.mark('imports')
+        # Hand the command to an already running instance instead of starting a second one
+        self.command, self.command_timer = self.parse_command(argv)
         self.single_instance = SingleInstance()
-        if self.single_instance.already_running():
-            QMessageBox.warning(None, "Timer", "An instance of Timer is already running.")
+        if self.single_instance.forward(self.command or DEFAULT_COMMAND, self.command_timer):
+            sys.exit(0)
+        if self.command not in LAUNCH_COMMANDS:
+            print(f"No running Timer instance to {self.command}", file=sys.stderr)
             sys.exit(1)
+        if not self.single_instance.listen():
+            self.single_instance.forward(self.command or DEFAULT_COMMAND, self.command_timer)
+            sys.exit(0)
+        self.single_instance.command_received.connect(self.handle_command)
+        # Opt-in stall watchdog; when off nothing is imported, wrapped or started
+        self.watchdog = None
+        threshold = self.parse_watchdog(argv)
+        if threshold is not None:
+            from stall_watchdog import Watchdog
+            self.watchdog = Watchdog(threshold, self)
+            self.trace_calls()
 
-        # Initialize config, screens, and application settings
+        # Initialize config and application settings
         self.setApplicationName("Timer")
         self.setApplicationDisplayName("Timer")
         self.config_manager = ConfigManager()
         self.config = self.config_manager.load_config()
-        self.screens = self.screens()
+        self.profile.mark('config load')
+        self.timer_pool = None
         self.timer_widget = None
         self.settings_dialog = None
+        self.history_dialog = None
+        self.session_history = None
+        self.splits = None
+        self.checkpoint = None
+        # Set by quit_deliberately, so quit() frees the checkpoint instead of leaving timers to resume
+        self.clear_state = False
+        self.event_bus = None
+        self.event_hooks = None
+        self.alarms = None
+        self.config_watcher = None
+        self.latency = None
         self.hotkey_handler = None
         self.tray_icon = None
         self.setQuitOnLastWindowClosed(False)
@@ -56,19 +139,203 @@ class TimerApp(QApplication):
         # Schedule delayed initialization
         QTimer.singleShot(0, self.delayed_init)
 
-    # Create and connect TimerWidget, SettingsDialog, and HotkeyHandler
+    # Find the command and optional timer name among the command line arguments
+    @staticmethod
+    def parse_command(argv):
+        args = [arg for arg in argv[1:] if not arg.startswith('-')]
+        if args and args[0] in COMMANDS:
+            return args[0], args[1] if len(args) > 1 else ''
+        return None, ''
+
+    # Show the timer overlays first; everything else starts once they are on screen
     def delayed_init(self):
-        self.timer_widget = TimerWidget(self.config, self.screens)
-        self.settings_dialog = SettingsDialog(self.config, self.screens)
+        self.timer_pool = TimerPool(self.config, self)
+        self.timer_widget = self.timer_pool.main
+        self.profile.mark('widget construction')
+        self.timer_widget.installEventFilter(self)
+        self.timer_pool.show()
+        # The overlays' first paint is already posted, so it runs before this
+        QTimer.singleShot(0, self.init_services)
+
+    # History, splits, checkpoint, events, alarms and the tray; hotkeys and hooks follow once they exist
+    def init_services(self):
+        from session_history import SessionHistory
+        from splits import Splits
+        from checkpoint import Checkpoint
+        from event_bus import EventBus
+        from alarms import Alarms
+        from latency import LatencyTracker
+        self.session_history = SessionHistory(self.config_manager.data_path('history.bin'))
+        self.timer_pool.session_finished.connect(self.session_history.record)
+        self.splits = Splits(self.config_manager.data_path('splits.json'))
+        self.timer_widget.set_splits(self.splits)
+        self.checkpoint = Checkpoint(self.config_manager.data_path('state.bin'))
+        self.timer_pool.set_checkpoint(self.checkpoint)
+        self.event_bus = EventBus()
+        self.latency = LatencyTracker(self)
+        self.timer_pool.timer_event.connect(self.publish_timer_event)
+        # Scheduled after the checkpoint, so alarms of resumed timers are armed too
+        self.alarms = Alarms(self.timer_pool, self.config, self)
+        self.alarms.alarm_fired.connect(
+            lambda name, timer_name, alert: self.event_bus.publish('alarm', {'timer': timer_name, 'alarm': name}))
+        self.setup_tray_icon()
+        self.profile.mark('services')
+        QTimer.singleShot(0, self.setup_hotkeys)
+        QTimer.singleShot(0, self.setup_event_hooks)
+        if self.command:
+            QTimer.singleShot(0, lambda: self.handle_command(self.command, self.command_timer))
+
+    # '--watchdog' enables the stall watchdog, '--watchdog=MS' also sets its stall threshold.
+    # A threshold that is not a positive number is reported and replaced by the default.
+    @staticmethod
+    def parse_watchdog(argv):
+        for arg in argv[1:]:
+            if arg == '--watchdog' or arg.startswith('--watchdog='):
+                from stall_watchdog import STALL_THRESHOLD_MS
+                value = arg.partition('=')[2]
+                if not value:
+                    return STALL_THRESHOLD_MS
+                try:
+                    threshold = float(value)
+                except ValueError:
+                    threshold = 0
+                if threshold > 0:
+                    return threshold
+                print(f"usage: --watchdog[=MS] with MS a positive number of milliseconds; "
+                      f"got {value!r}, using {STALL_THRESHOLD_MS} ms", file=sys.stderr)
+                return STALL_THRESHOLD_MS
+        return None
+
+    # Record ticks, paints, config applies and hotkey dispatches in the watchdog's trace
+    def trace_calls(self):
+        from timer_scheduler import TimerScheduler
+        from timer_widget import TimerWidget
+        from hotkey_dispatcher import HotkeyDispatcher
+        from config_watcher import ConfigWatcher
+        traced = (
+            (TimerScheduler, 'tick', 'tick'),
+            (TimerWidget, 'paintEvent', 'paint'),
+            (TimerWidget, 'update_position', 'position'),
+            (TimerWidget, 'update_label_style', 'style'),
+            (ConfigManager, 'save_config', 'config'),
+            (ConfigWatcher, 'reload', 'config'),
+            (TimerApp, 'update_config', 'config'),
+            (TimerApp, 'update_config_preview', 'config'),
+            (HotkeyDispatcher, 'flush', 'hotkey'),
+            (TimerApp, 'dispatch_hotkey', 'hotkey'),
+        )
+        for cls, name, category in traced:
+            self.watchdog.instrument(cls, name, category)
+
+    # Write the watchdog's trace next to the config file
+    def dump_trace(self):
+        path = self.config_manager.data_path('trace.json')
+        self.watchdog.export(path)
+        return path
+
+    # Run a command given on the command line or forwarded by another invocation
+    def handle_command(self, command, timer_name=''):
+        if command == 'start':
+            self.timer_pool.start(timer_name)
+        elif command == 'stop':
+            self.timer_pool.stop(timer_name)
+        elif command == 'split':
+            self.timer_pool.split(timer_name)
+        elif command == 'reset':
+            self.timer_pool.reset(timer_name)
+        elif command == 'settings':
+            if not (self.settings_dialog and self.settings_dialog.isVisible()):
+                self.show_settings()
+        elif command == 'quit':
+            self.quit_deliberately()
+
+    # Subscribe the scripts, text files and webhooks configured in event_hooks
+    def setup_event_hooks(self):
+        from event_hooks import EventHooks
+        self.event_hooks = EventHooks(self.event_bus, self.config)
+
+    # Hand a timer event to the bus; subscribers run on its worker threads
+    def publish_timer_event(self, event, timer_name, elapsed):
+        self.event_bus.publish(event, {'timer': timer_name, 'elapsed': elapsed})
+
+    # Record the overlay's first paint for the startup profile
+    def eventFilter(self, obj, event):
+        if obj is self.timer_widget and event.type() == QEvent.Type.Paint:
+            self.timer_widget.removeEventFilter(self)
+            self.profile.mark('first paint')
+            self.report_startup()
+        return False
+
+    # First paint and hook installation finish in either order; report once both have
+    def report_startup(self):
+        if self.profile.has('first paint') and self.profile.has('hooks ready'):
+            self.profile.report()
+
+    def setup_hotkeys(self):
+        from hotkeyhandler import HotkeyHandler
         self.hotkey_handler = HotkeyHandler(self.config)
-        self.hotkey_handler.start_signal.connect(self.timer_widget.start_timer)
-        self.hotkey_handler.stop_signal.connect(self.timer_widget.stop_timer)
+        self.hotkey_handler.latency = self.latency
+        self.hotkey_handler.start_signal.connect(lambda: self.dispatch_hotkey(self.timer_pool.start))
+        self.hotkey_handler.stop_signal.connect(lambda: self.dispatch_hotkey(self.timer_pool.stop))
+        self.hotkey_handler.timer_start_signal.connect(lambda name: self.dispatch_hotkey(self.timer_pool.start, name))
+        self.hotkey_handler.timer_stop_signal.connect(lambda name: self.dispatch_hotkey(self.timer_pool.stop, name))
+        self.hotkey_handler.split_signal.connect(lambda: self.dispatch_hotkey(self.timer_pool.split))
+        self.hotkey_handler.kill_signal.connect(self.quit)
+        if self.settings_dialog:
+            self.connect_settings_dialog()
+        self.profile.mark('hooks ready')
+        self.report_startup()
+        self.watch_config()
+
+    # Re-apply config.json when it is edited outside the application
+    def watch_config(self):
+        from config_watcher import ConfigWatcher
+        self.config_watcher = ConfigWatcher(self.config_manager, self.config, self)
+        self.config_watcher.config_changed.connect(self.apply_external_config)
+
+    # Update the shared config dict in place, so the settings dialog sees the new values too
+    def apply_external_config(self, new_config):
+        self.config.update(new_config)
+        self.update_config(self.config)
+
+    # Run a hotkey action on a timer, timing each stage until the overlay repaints
+    def dispatch_hotkey(self, action, timer_name=None):
+        self.latency.received()
+        # A press that changes nothing (start while running, stop while stopped) repaints nothing,
+        # so timing it against the next regular paint would count idle time
+        if action(timer_name):
+            self.latency.applied(self.timer_pool.get(timer_name))
+        else:
+            self.latency.discard()
+        if not self.tooltip_timer.isActive():
+            self.tooltip_timer.start()
+
+    def update_tooltip(self):
+        checks, reasserts = self.timer_widget.zorder.group.stats()
+        tooltip = f"Timer\n{self.latency.summary()}\nOn top: {reasserts} re-asserts in {checks} checks"
+        if self.watchdog:
+            tooltip += f"\n{self.watchdog.summary()}"
+        self.tray_icon.setToolTip(tooltip)
+
+    # Write the latency histograms next to the config file
+    def dump_latency(self):
+        path = self.config_manager.data_path('latency.json')
+        self.latency.dump(path)
+        self.tray_icon.showMessage("Timer", f"Latency histograms written to {path}")
+
+    # Build the settings dialog the first time it is needed
+    def ensure_settings_dialog(self):
+        if self.settings_dialog is None:
+            from settings_dialog import SettingsDialog
+            self.settings_dialog = SettingsDialog(self.config)
+            self.settings_dialog.config_updated.connect(self.update_config_preview)
+            if self.hotkey_handler:
+                self.connect_settings_dialog()
+        return self.settings_dialog
+
+    def connect_settings_dialog(self):
         self.settings_dialog.hotkeys_disabled.connect(self.hotkey_handler.disable_hotkeys)
         self.settings_dialog.hotkeys_enabled.connect(self.hotkey_handler.enable_hotkeys)
-        self.settings_dialog.config_updated.connect(self.update_config_preview)
-        self.setup_tray_icon()
-        self.timer_widget.show()
-        self.timer_widget.update_position()
 
     # Create system tray icon with settings and quit options
     def setup_tray_icon(self):
@@ -79,39 +346,92 @@ class TimerApp(QApplication):
         self.tray_icon.setToolTip("Timer")
         self.tray_menu = QMenu()
         self.settings_action = self.tray_menu.addAction("Settings")
+        self.history_action = self.tray_menu.addAction("History")
+        self.latency_action = self.tray_menu.addAction("Dump Latency")
         self.quit_action = self.tray_menu.addAction("Quit")
         self.settings_action.triggered.connect(self.show_settings)
-        self.quit_action.triggered.connect(self.quit)
+        self.history_action.triggered.connect(self.show_history)
+        self.latency_action.triggered.connect(self.dump_latency)
+        if self.watchdog:
+            trace_action = self.tray_menu.addAction("Dump Trace")
+            trace_action.triggered.connect(
+                lambda: self.tray_icon.showMessage("Timer", f"Trace written to {self.dump_trace()}"))
+            self.tray_menu.insertAction(self.quit_action, trace_action)
+        # The tooltip is refreshed shortly after hotkey presses, outside the measured path
+        self.tooltip_timer = QTimer(self)
+        self.tooltip_timer.setSingleShot(True)
+        self.tooltip_timer.setInterval(1000)
+        self.tooltip_timer.timeout.connect(self.update_tooltip)
+        self.quit_action.triggered.connect(self.quit_deliberately)
         self.tray_icon.setContextMenu(self.tray_menu)
         self.tray_icon.show()
 
     # Display settings dialog and handle configuration updates
     def show_settings(self):
-        if self.settings_dialog.exec() == SettingsDialog.Accepted:
+        if self.ensure_settings_dialog().exec() == self.settings_dialog.Accepted:
             self.update_config(self.config)
             self.config_manager.save_config(self.config)
         else:
             # If dialog was cancelled, revert to original config
             self.update_config_preview(self.config)
 
+    # Display session statistics, building the dialog on first use
+    def show_history(self):
+        if self.history_dialog is None:
+            from history_dialog import HistoryDialog
+            self.history_dialog = HistoryDialog(self.session_history, self.config)
+        self.history_dialog.config = self.config
+        self.history_dialog.show()
+        self.history_dialog.raise_()
+
     # Update UI components with new configuration (preview mode)
     def update_config_preview(self, new_config):
-        self.timer_widget.update_config(new_config)
-        self.hotkey_handler.update_config(new_config)
+        self.timer_pool.update_config(new_config)
+        self.alarms.update_config(new_config)
+        if self.hotkey_handler:
+            self.hotkey_handler.update_config(new_config)
 
     # Apply new configuration to all components
     def update_config(self, new_config):
         self.config = new_config
-        self.timer_widget.update_config(self.config)
-        self.hotkey_handler.update_config(self.config)
+        self.timer_pool.update_config(self.config)
+        self.alarms.update_config(self.config)
+        if self.hotkey_handler:
+            self.hotkey_handler.update_config(self.config)
+        if self.event_hooks:
+            self.event_hooks.update_config(self.config)
+        if self.config_watcher:
+            self.config_watcher.set_config(self.config)
         
+    # Quit from the tray menu or the quit command: the timers start afresh next time. The kill key
+    # quits through quit() alone, so like a kill or a crash it leaves running timers to resume.
+    def quit_deliberately(self):
+        self.clear_state = True
+        self.quit()
+
     # Clean up resources and exit the application
     def quit(self):
-        keyboard = import_keyboard()
-        keyboard.unhook_all_hotkeys()
-        self.tray_icon.setVisible(False)
-        if os.path.exists(self.single_instance.lockfile):
-            os.remove(self.single_instance.lockfile)
+        if self.hotkey_handler:
+            self.hotkey_handler.close()
+        if self.tray_icon:
+            self.tray_icon.setVisible(False)
+        self.single_instance.close()
+        if self.session_history:
+            self.session_history.close()
+        if self.splits:
+            self.splits.flush()
+        if self.checkpoint:
+            # Detached first, so nothing saves into the closed map while the event loop winds down
+            self.timer_pool.set_checkpoint(None)
+            if self.clear_state:
+                self.checkpoint.clear_all()
+            self.checkpoint.close()
+        if self.event_bus:
+            self.event_bus.close()
+        if self.watchdog:
+            self.watchdog.close()
+            self.dump_trace()
+        self.config_manager.flush()
         super().quit()
 
 if __name__ == '__main__':
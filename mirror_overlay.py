@@ -0,0 +1,31 @@
+from PySide6.QtWidgets import QWidget
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QPainter
+from zorder import ZOrderManager
+
+class MirrorWindow(QWidget):
+    # Frameless overlay on another screen that only blits its source widget's shared frame;
+    # it has no text, atlas or layout of its own
+    def __init__(self, source):
+        super().__init__()
+        self.source = source
+        self.setWindowFlags(
+            Qt.WindowType.FramelessWindowHint |
+            Qt.WindowType.WindowStaysOnTopHint |
+            Qt.WindowType.Tool |
+            Qt.WindowType.WindowTransparentForInput |
+            Qt.WindowType.SubWindow
+        )
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.zorder = ZOrderManager(self)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        self.source.blit(painter, event.rect())
+        painter.end()
+
+    def close_window(self):
+        self.zorder.close()
+        self.close()
+        self.deleteLater()
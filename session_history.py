@@ -0,0 +1,133 @@
+import bisect
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta
+
+# Fixed-size record: wall-clock start (epoch seconds), duration (seconds) and timer id, all float64
+RECORD = struct.Struct('<ddd')
+FIELDS = 3
+# Seconds the writer waits to batch further sessions before appending them
+FLUSH_INTERVAL = 1.0
+
+# Stable numeric id for a timer name, exactly representable as a float64
+def timer_id(name):
+    return float(zlib.crc32(name.encode()))
+
+# Value at the given fraction of an already sorted list
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+class SessionHistory:
+    # Append-only session log; writes go through a background thread, reads use mmap
+    def __init__(self, path):
+        self.path = path
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.write_loop, name='session-history', daemon=True)
+        self.thread.start()
+
+    # Queue a finished session; never touches the disk on the calling thread
+    def record(self, name, started_at, duration):
+        self.queue.put(RECORD.pack(started_at, duration, timer_id(name)))
+
+    def write_loop(self):
+        self.drop_partial_record()
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while batch[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                running = False
+                batch.pop()
+            if batch:
+                with open(self.path, 'ab') as f:
+                    f.write(b''.join(batch))
+
+    # A crash mid-append can leave a partial record; cut it so later records stay aligned
+    def drop_partial_record(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size % RECORD.size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(size - size % RECORD.size)
+
+    # Write everything still queued and stop the writer thread
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    # Read (start times, durations) for one timer, or all timers, through a memory map
+    def load(self, name=None):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return [], []
+        length = size - size % RECORD.size
+        if not length:
+            return [], []
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ) as mapped:
+            values = memoryview(mapped).cast('d')
+            try:
+                # Strided slices copy one column each without a Python-level loop
+                starts = values[0::FIELDS].tolist()
+                durations = values[1::FIELDS].tolist()
+                ids = values[2::FIELDS].tolist() if name is not None else None
+            finally:
+                values.release()
+        if name is not None:
+            wanted = timer_id(name)
+            keep = [i for i, value in enumerate(ids) if value == wanted]
+            starts = [starts[i] for i in keep]
+            durations = [durations[i] for i in keep]
+        return starts, durations
+
+    # Summary statistics and per-day totals (local dates) over the stored sessions
+    def stats(self, name=None):
+        starts, durations = self.load(name)
+        ordered = sorted(durations)
+        count = len(ordered)
+        return {
+            'count': count,
+            'total': sum(ordered),
+            'mean': sum(ordered) / count if count else 0.0,
+            'best': ordered[0] if count else 0.0,
+            'p50': percentile(ordered, 0.5),
+            'p90': percentile(ordered, 0.9),
+            'p99': percentile(ordered, 0.99),
+            'per_day': self.per_day_totals(starts, durations),
+        }
+
+    # Sessions are appended in time order, so each day is a contiguous slice found by bisection
+    def per_day_totals(self, starts, durations):
+        per_day = {}
+        if not starts:
+            return per_day
+        if starts != sorted(starts):
+            for started_at, duration in zip(starts, durations):
+                day = date.fromtimestamp(started_at)
+                per_day[day] = per_day.get(day, 0.0) + duration
+            return per_day
+        index = 0
+        while index < len(starts):
+            day = date.fromtimestamp(starts[index])
+            next_day = datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp()
+            end = bisect.bisect_left(starts, next_day, index)
+            per_day[day] = sum(durations[index:end])
+            index = end
+        return per_day
@@ -1,24 +1,43 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
-                               QLabel, QComboBox, QWidget, QMessageBox)
-from PySide6.QtCore import Signal, Qt
-from PySide6.QtGui import QKeySequence, QIcon
+                               QLabel, QComboBox, QWidget, QMessageBox, QSpinBox,
+                               QTableWidget, QTableWidgetItem)
+from PySide6.QtCore import Signal, Qt, QTimer, QKeyCombination
+from PySide6.QtGui import QKeySequence, QIcon, QGuiApplication, QColor
 import copy
 from utils import resource_path
+from timer_widget import ANCHORS
+from hotkey_bindings import SEQUENCE_SEPARATOR, SEQUENCE_TIMEOUT, config_bindings, find_conflicts
+from alarms import ALERTS, parse_duration, format_duration
+from timer_core import MAIN_TIMER
+
+# Keys that only modify a chord and are not captured on their own
+MODIFIER_KEYS = {Qt.Key.Key_Control, Qt.Key.Key_Shift, Qt.Key.Key_Alt, Qt.Key.Key_AltGr, Qt.Key.Key_Meta}
+# Longest key sequence that can be captured
+MAX_SEQUENCE = 3
+# Columns of the alarm table
+ALARM_COLUMNS = ('Name', 'Timer', 'At', 'Repeat', 'Alert')
+# Background of alarm cells that do not parse
+INVALID_COLOR = QColor(255, 120, 120)
 
 class SettingsDialog(QDialog):
     config_updated = Signal(dict)
     hotkeys_disabled = Signal()
     hotkeys_enabled = Signal()
     
-    # Initialize dialog with current config and available screens
-    def __init__(self, config, screens):
+    # Initialize dialog with current config
+    def __init__(self, config):
         super().__init__()
         self.original_config = config
         self.temp_config = copy.deepcopy(config)
-        self.screens = screens
         self.setWindowTitle("Settings")
         self.setWindowIcon(QIcon(resource_path("icon.ico")))
         self.current_key_binding = None
+        self.captured_steps = []
+        # Capture ends when no further chord follows within the sequence timeout
+        self.capture_timer = QTimer(self)
+        self.capture_timer.setSingleShot(True)
+        self.capture_timer.setInterval(int(SEQUENCE_TIMEOUT * 1000))
+        self.capture_timer.timeout.connect(self.finish_key_binding)
         self.init_ui()
         
         # Connect the finished signal to re-enable hotkeys
@@ -43,12 +62,19 @@ class SettingsDialog(QDialog):
         layout.addLayout(stop_layout)
         
         # Kill key binding
-        self.kill_key_button = QPushButton(self.temp_config.get('kill_key', 'Not Set'))
+        self.kill_key_button = QPushButton(self.temp_config.get('kill_key') or 'Not Set')
         self.kill_key_button.setObjectName('kill_key')
         self.kill_key_button.clicked.connect(lambda: self.set_key_binding('kill_key'))
         kill_layout = self.create_option_layout('Kill Key:', self.kill_key_button)
         layout.addLayout(kill_layout)
         
+        # Split key binding
+        self.split_key_button = QPushButton(self.temp_config.get('split_key') or 'Not Set')
+        self.split_key_button.setObjectName('split_key')
+        self.split_key_button.clicked.connect(lambda: self.set_key_binding('split_key'))
+        split_layout = self.create_option_layout('Split Key:', self.split_key_button)
+        layout.addLayout(split_layout)
+        
         # Color picker
         self.color_combo = QComboBox()
         colors = ['red', 'green', 'blue', 'yellow', 'cyan', 'magenta', 'white']
@@ -60,27 +86,61 @@ class SettingsDialog(QDialog):
         
         # Position
         self.position_combo = QComboBox()
-        self.position_combo.addItems(['top_left', 'top_right', 'bottom_left', 'bottom_right'])
+        self.position_combo.addItems(list(ANCHORS))
         self.position_combo.setCurrentText(self.temp_config['position'])
         self.position_combo.currentTextChanged.connect(self.update_position)
         position_layout = self.create_option_layout('Position:', self.position_combo)
         layout.addLayout(position_layout)
         
-        # Screen selection
+        # Pixel offsets from the anchor
+        self.offset_x_spin = self.create_offset_spin('offset_x')
+        layout.addLayout(self.create_option_layout('Offset X:', self.offset_x_spin))
+        self.offset_y_spin = self.create_offset_spin('offset_y')
+        layout.addLayout(self.create_option_layout('Offset Y:', self.offset_y_spin))
+        
+        # Display resolution
+        self.resolution_combo = QComboBox()
+        self.resolution_combo.addItems(['seconds', 'tenths', 'milliseconds'])
+        self.resolution_combo.setCurrentText(self.temp_config.get('resolution', 'seconds'))
+        self.resolution_combo.currentTextChanged.connect(self.update_resolution)
+        resolution_layout = self.create_option_layout('Resolution:', self.resolution_combo)
+        layout.addLayout(resolution_layout)
+        
+        # Screen selection: every checked screen shows the overlay, mirrored from the first one
         self.screen_combo = QComboBox()
-        self.screen_combo.addItems([f"Screen {i+1}" for i in range(len(self.screens))])
-        self.screen_combo.setCurrentIndex(self.temp_config.get('screen_index', 0))
-        self.screen_combo.currentIndexChanged.connect(self.update_screen)
+        self.screen_combo.setEditable(True)
+        self.screen_combo.lineEdit().setReadOnly(True)
+        self.screen_combo.view().pressed.connect(self.toggle_screen)
+        self.screen_combo.activated.connect(self.show_screen_selection)
+        self.populate_screens()
         screen_layout = self.create_option_layout('Screen:', self.screen_combo)
         layout.addLayout(screen_layout)
         
+        # Alarms at elapsed times (m:ss), optionally repeating, announced by flash, sound or both
+        layout.addWidget(QLabel('Alarms:'))
+        self.alarm_table = QTableWidget(0, len(ALARM_COLUMNS))
+        self.alarm_table.setHorizontalHeaderLabels(ALARM_COLUMNS)
+        self.alarm_table.verticalHeader().setVisible(False)
+        self.alarm_table.setMaximumHeight(140)
+        self.populate_alarms()
+        self.alarm_table.itemChanged.connect(self.update_alarms)
+        layout.addWidget(self.alarm_table)
+        alarm_button_layout = QHBoxLayout()
+        add_alarm_button = QPushButton('Add Alarm')
+        add_alarm_button.clicked.connect(self.add_alarm)
+        remove_alarm_button = QPushButton('Remove Alarm')
+        remove_alarm_button.clicked.connect(self.remove_alarm)
+        alarm_button_layout.addWidget(add_alarm_button)
+        alarm_button_layout.addWidget(remove_alarm_button)
+        layout.addLayout(alarm_button_layout)
+        
         # Save and Cancel buttons
         button_layout = QHBoxLayout()
-        save_button = QPushButton('Save')
-        save_button.clicked.connect(self.save_config)
+        self.save_button = QPushButton('Save')
+        self.save_button.clicked.connect(self.save_config)
         cancel_button = QPushButton('Cancel')
         cancel_button.clicked.connect(self.reject)
-        button_layout.addWidget(save_button)
+        button_layout.addWidget(self.save_button)
         button_layout.addWidget(cancel_button)
         layout.addLayout(button_layout)
         
@@ -98,47 +158,186 @@ class SettingsDialog(QDialog):
         layout.addStretch()
         return layout
 
+    def create_offset_spin(self, key):
+        spin = QSpinBox()
+        spin.setRange(-10000, 10000)
+        spin.setSuffix(' px')
+        spin.setValue(self.temp_config.get(key, 0))
+        spin.valueChanged.connect(lambda value: self.update_offset(key, value))
+        return spin
+
+    # List the screens that are connected right now, checking the selected ones
+    def populate_screens(self):
+        selected = self.selected_screens()
+        self.screen_combo.blockSignals(True)
+        self.screen_combo.clear()
+        self.screen_combo.addItems([f"Screen {i+1}" for i in range(len(QGuiApplication.screens()))])
+        model = self.screen_combo.model()
+        for i in range(model.rowCount()):
+            model.item(i).setCheckState(Qt.CheckState.Checked if i in selected else Qt.CheckState.Unchecked)
+        self.screen_combo.blockSignals(False)
+        self.show_screen_selection()
+
+    def selected_screens(self):
+        return [self.temp_config.get('screen_index', 0)] + list(self.temp_config.get('mirror_screens', []))
+
+    def show_screen_selection(self, *args):
+        model = self.screen_combo.model()
+        names = [model.item(i).text() for i in range(model.rowCount())
+                 if model.item(i).checkState() == Qt.CheckState.Checked]
+        self.screen_combo.lineEdit().setText(', '.join(names))
+
+    def populate_alarms(self):
+        self.alarm_table.blockSignals(True)
+        self.alarm_table.setRowCount(0)
+        for alarm in self.temp_config.get('alarms', []):
+            self.add_alarm_row(alarm)
+        self.alarm_table.blockSignals(False)
+
+    def add_alarm_row(self, alarm):
+        row = self.alarm_table.rowCount()
+        self.alarm_table.insertRow(row)
+        repeat = alarm.get('repeat', 0)
+        values = (alarm.get('name', ''), alarm.get('timer') or MAIN_TIMER, format_duration(alarm['at']),
+                  format_duration(repeat) if repeat else '', alarm.get('alert', 'flash'))
+        for column, value in enumerate(values):
+            self.alarm_table.setItem(row, column, QTableWidgetItem(value))
+        # The last valid alarm of the row, kept while an edit does not parse
+        self.alarm_table.item(row, 0).setData(Qt.ItemDataRole.UserRole, alarm)
+
+    def add_alarm(self):
+        self.alarm_table.blockSignals(True)
+        self.add_alarm_row({'name': 'Alarm', 'timer': MAIN_TIMER, 'at': 300, 'alert': 'flash'})
+        self.alarm_table.blockSignals(False)
+        self.update_alarms()
+
+    def remove_alarm(self):
+        row = self.alarm_table.currentRow()
+        if row >= 0:
+            self.alarm_table.removeRow(row)
+            self.update_alarms()
+
+    # Parse one table row; returns the alarm, or None and the columns that do not parse
+    def parse_alarm_row(self, row):
+        name, timer, at, repeat, alert = (self.alarm_table.item(row, column).text().strip()
+                                          if self.alarm_table.item(row, column) else ''
+                                          for column in range(len(ALARM_COLUMNS)))
+        invalid = []
+        try:
+            at = parse_duration(at)
+        except ValueError:
+            invalid.append(2)
+        try:
+            repeat = parse_duration(repeat) if repeat else 0
+        except ValueError:
+            invalid.append(3)
+        alert = alert or 'flash'
+        if alert not in ALERTS:
+            invalid.append(4)
+        if invalid:
+            return None, invalid
+        return {'name': name, 'timer': timer or MAIN_TIMER, 'at': at, 'repeat': repeat, 'alert': alert}, invalid
+
+    # Rebuild the alarm list from the table. A row that does not parse keeps its last valid alarm,
+    # its bad cells are marked and Save is blocked until they are fixed, so no alarm is lost silently.
+    def update_alarms(self, *args):
+        alarms = []
+        any_invalid = False
+        self.alarm_table.blockSignals(True)
+        for row in range(self.alarm_table.rowCount()):
+            alarm, invalid = self.parse_alarm_row(row)
+            first = self.alarm_table.item(row, 0)
+            if alarm is None:
+                any_invalid = True
+                alarm = first.data(Qt.ItemDataRole.UserRole) if first else None
+            elif first:
+                first.setData(Qt.ItemDataRole.UserRole, alarm)
+            for column in range(len(ALARM_COLUMNS)):
+                item = self.alarm_table.item(row, column)
+                if item:
+                    item.setData(Qt.ItemDataRole.BackgroundRole, INVALID_COLOR if column in invalid else None)
+                    item.setToolTip('Not a valid value' if column in invalid else '')
+            if alarm is not None:
+                alarms.append(alarm)
+        self.alarm_table.blockSignals(False)
+        self.save_button.setEnabled(not any_invalid)
+        self.save_button.setToolTip('Fix the marked alarm cells first' if any_invalid else '')
+        self.temp_config['alarms'] = alarms
+        self.config_updated.emit(self.temp_config)
+
     # Prepare UI for capturing a new key binding    
     def set_key_binding(self, key_type):
         self.current_key_binding = key_type
+        self.captured_steps = []
         button = self.findChild(QPushButton, key_type)
         if button:
             button.setText('Press a key...')
             button.setFocus()
             self.grabKeyboard()  # Grab keyboard focus
         
-    # Handle key press events for hotkey configuration
+    # Handle key press events for hotkey configuration: each chord, modifiers included,
+    # is one step of the binding, and further chords within the sequence timeout extend it
     def keyPressEvent(self, event):
         if self.current_key_binding:
-            key = QKeySequence(event.key()).toString()
-            
-            # Check if the key is already in use
-            if self.is_key_duplicate(key):
-                QMessageBox.warning(self, "Duplicate Key", f"The key '{key}' is already in use. Please choose a different key.")
-                self.reset_key_binding()
+            key = Qt.Key(event.key())
+            if key in MODIFIER_KEYS or event.isAutoRepeat():
                 return
+            modifiers = event.modifiers() & ~Qt.KeyboardModifier.KeypadModifier
+            self.captured_steps.append(QKeySequence(QKeyCombination(modifiers, key)).toString())
             
             button = self.findChild(QPushButton, self.current_key_binding)
             if button:
-                button.setText(key)
-                self.temp_config[self.current_key_binding] = key
-            
-            self.reset_key_binding()
-            self.config_updated.emit(self.temp_config)
+                button.setText(SEQUENCE_SEPARATOR.join(self.captured_steps) + SEQUENCE_SEPARATOR + '...')
+            if len(self.captured_steps) >= MAX_SEQUENCE:
+                self.finish_key_binding()
+            else:
+                self.capture_timer.start()
         else:
             super().keyPressEvent(event)
     
+    # Apply the captured binding unless it conflicts with another hotkey
+    def finish_key_binding(self):
+        self.capture_timer.stop()
+        if not self.current_key_binding or not self.captured_steps:
+            return
+        key = SEQUENCE_SEPARATOR.join(self.captured_steps)
+        
+        conflict = self.binding_conflict(self.current_key_binding, key)
+        if conflict:
+            QMessageBox.warning(self, "Key Conflict", conflict)
+            self.reset_key_binding()
+            return
+        
+        button = self.findChild(QPushButton, self.current_key_binding)
+        if button:
+            button.setText(key)
+            self.temp_config[self.current_key_binding] = key
+        
+        self.reset_key_binding()
+        self.config_updated.emit(self.temp_config)
+    
     # Reset UI after key binding is set or cancelled
     def reset_key_binding(self):
         self.releaseKeyboard()
+        self.capture_timer.stop()
         self.current_key_binding = None
-        for button in [self.start_key_button, self.stop_key_button, self.kill_key_button]:
-            if button.text() == 'Press a key...':
-                button.setText(self.temp_config.get(button.objectName(), 'Not Set'))
+        self.captured_steps = []
+        for button in [self.start_key_button, self.stop_key_button, self.kill_key_button, self.split_key_button]:
+            button.setText(self.temp_config.get(button.objectName()) or 'Not Set')
     
-    # Check if the key is already in use
-    def is_key_duplicate(self, key):
-        return key in [self.temp_config['start_key'], self.temp_config['stop_key'], self.temp_config.get('kill_key')]
+    # Describe how a binding clashes with the other hotkeys: the same keys, one being the start
+    # of the other (so the longer one could never trigger), or keys that cannot be bound
+    def binding_conflict(self, key_type, key):
+        bindings = [(label, text) for label, text, _ in config_bindings(self.temp_config) if label != key_type]
+        for label, other, kind in find_conflicts(bindings + [(key_type, key)]):
+            if label != key_type:
+                continue
+            if kind == 'duplicate':
+                return f"The key '{key}' is already used by {other}. Please choose a different key."
+            if kind == 'prefix':
+                return f"The key '{key}' starts with the same keys as {other}. Please choose a different key."
+            return f"The key '{key}' cannot be used as a hotkey."
+        return None
         
     def update_color(self, color):
         self.temp_config['color'] = color
@@ -148,8 +347,29 @@ class SettingsDialog(QDialog):
         self.temp_config['position'] = position
         self.config_updated.emit(self.temp_config)
         
-    def update_screen(self, index):
-        self.temp_config['screen_index'] = index
+    def update_offset(self, key, value):
+        self.temp_config[key] = value
+        self.config_updated.emit(self.temp_config)
+        
+    def update_resolution(self, resolution):
+        self.temp_config['resolution'] = resolution
+        self.config_updated.emit(self.temp_config)
+        
+    # Check or uncheck a screen; the primary screen stays first and at least one stays checked
+    def toggle_screen(self, model_index):
+        selected = self.selected_screens()
+        index = model_index.row()
+        if index in selected:
+            if len(selected) == 1:
+                return
+            selected.remove(index)
+        else:
+            selected.append(index)
+        self.temp_config['screen_index'] = selected[0]
+        self.temp_config['mirror_screens'] = sorted(selected[1:])
+        item = self.screen_combo.model().item(index)
+        item.setCheckState(Qt.CheckState.Checked if index in selected else Qt.CheckState.Unchecked)
+        self.show_screen_selection()
         self.config_updated.emit(self.temp_config)
         
     def save_config(self):
@@ -168,10 +388,17 @@ class SettingsDialog(QDialog):
         self.temp_config = copy.deepcopy(self.original_config)
         self.start_key_button.setText(self.temp_config['start_key'])
         self.stop_key_button.setText(self.temp_config['stop_key'])
-        self.kill_key_button.setText(self.temp_config.get('kill_key', 'Not Set'))
+        self.kill_key_button.setText(self.temp_config.get('kill_key') or 'Not Set')
+        self.split_key_button.setText(self.temp_config.get('split_key') or 'Not Set')
         self.color_combo.setCurrentText(self.temp_config['color'])
         self.position_combo.setCurrentText(self.temp_config['position'])
-        self.screen_combo.setCurrentIndex(self.temp_config.get('screen_index', 0))
+        self.resolution_combo.setCurrentText(self.temp_config.get('resolution', 'seconds'))
+        self.offset_x_spin.setValue(self.temp_config.get('offset_x', 0))
+        self.offset_y_spin.setValue(self.temp_config.get('offset_y', 0))
+        self.populate_screens()
+        self.populate_alarms()
+        self.save_button.setEnabled(True)
+        self.save_button.setToolTip('')
         self.hotkeys_disabled.emit()  # Disable hotkeys when settings dialog is shown
         super().showEvent(event)
     
@@ -0,0 +1,113 @@
+import json
+from array import array
+from utils import DebouncedWriter, write_atomic
+
+# Format a split delta as +s.d, or +m:ss.d from a minute on
+def format_delta(delta):
+    sign = '-' if delta < 0 else '+'
+    tenths = int(abs(delta) * 10)
+    minutes, tenths = divmod(tenths, 600)
+    if minutes:
+        return f"{sign}{minutes}:{tenths // 10:02d}.{tenths % 10}"
+    return f"{sign}{tenths // 10}.{tenths % 10}"
+
+class Splits:
+    # Segments of a run with the personal best (cumulative split times) and gold (best time of each
+    # segment), stored as JSON. The comparison arrays are precomputed when a run starts, so the
+    # per-tick delta is two array lookups.
+    def __init__(self, path):
+        self.path = path
+        self.names = []
+        self.pb = []
+        self.golds = []
+        self.load()
+        self.count = len(self.names)
+        self.times = array('d', bytes(8 * self.count))
+        self.comparison = None
+        self.index = 0
+        # Written off the GUI thread, so runs ended in quick succession cost one write
+        self.writer = DebouncedWriter(lambda data: write_atomic(self.path, data, prefix='.splits-'))
+
+    # Read the split file; a missing or malformed file leaves no segments
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            segments = data['segments']
+            self.names = [str(segment['name']) for segment in segments]
+            self.pb = [segment.get('pb') for segment in segments]
+            self.golds = [segment.get('gold') for segment in segments]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.names, self.pb, self.golds = [], [], []
+
+    # Schedule the segments to be written on the writer's timer thread
+    def save(self):
+        data = json.dumps({'segments': [{'name': name, 'pb': pb, 'gold': gold}
+                                        for name, pb, gold in zip(self.names, self.pb, self.golds)]}, indent=2)
+        self.writer.save(data)
+
+    # Write any pending save now
+    def flush(self):
+        self.writer.flush()
+
+    # Compare against the personal best, or against the sum of golds until a full run exists
+    def start_run(self):
+        self.index = 0
+        if self.count and None not in self.pb:
+            self.comparison = array('d', self.pb)
+        elif self.count and None not in self.golds:
+            self.comparison = array('d', self.golds)
+            for index in range(1, self.count):
+                self.comparison[index] += self.comparison[index - 1]
+        else:
+            self.comparison = None
+
+    # Continue a run checkpointed before a crash from its recorded split times
+    def resume_run(self, times):
+        self.start_run()
+        self.index = min(len(times), self.count)
+        for index in range(self.index):
+            self.times[index] = times[index]
+
+    # Split times of the current run so far
+    def run_times(self):
+        return self.times[:self.index].tolist()
+
+    # Record a split at the given elapsed time; returns True when it completed the run
+    def split(self, elapsed):
+        if self.index >= self.count:
+            return False
+        self.times[self.index] = elapsed
+        self.index += 1
+        return self.index == self.count
+
+    # Seconds ahead (negative) or behind the comparison, or None when there is nothing to show.
+    # While the current segment is still ahead, the delta of the last split stays on screen.
+    def delta(self, elapsed):
+        comparison = self.comparison
+        if comparison is None:
+            return None
+        index = self.index
+        if index < self.count and elapsed > comparison[index]:
+            return elapsed - comparison[index]
+        if index:
+            return self.times[index - 1] - comparison[index - 1]
+        return None
+
+    # Fold the finished or abandoned run into the golds and, if it was complete and faster, the PB.
+    # The run's splits stay on screen until the next start_run. Returns True when a save was scheduled.
+    def end_run(self):
+        changed = False
+        previous = 0.0
+        for index in range(self.index):
+            segment = self.times[index] - previous
+            previous = self.times[index]
+            if self.golds[index] is None or segment < self.golds[index]:
+                self.golds[index] = segment
+                changed = True
+        if self.count and self.index == self.count and (self.pb[-1] is None or self.times[-1] < self.pb[-1]):
+            self.pb = self.times.tolist()
+            changed = True
+        if changed:
+            self.save()
+        return changed
@@ -0,0 +1,114 @@
+import collections
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from PySide6.QtCore import QObject, Qt, Signal
+from utils import write_atomic
+
+# Event-loop lag that counts as a stall, in milliseconds
+STALL_THRESHOLD_MS = 50
+# Seconds between probes of the event loop
+PROBE_INTERVAL = 0.02
+# Trace events kept; older ones are dropped first
+TRACE_EVENTS = 200000
+
+class Watchdog(QObject):
+    # Posted from the helper thread and answered by the GUI thread's event loop
+    probe = Signal(float)
+
+    # Measure event-loop lag from a helper thread and trace instrumented calls. Only created when
+    # enabled; nothing is wrapped or started otherwise, so a disabled watchdog costs nothing.
+    def __init__(self, threshold_ms=STALL_THRESHOLD_MS, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.gui_thread = threading.get_ident()
+        self.events = collections.deque(maxlen=TRACE_EVENTS)
+        self.stalls = []
+        self.lock = threading.Lock()
+        self.posted_at = None
+        self.stack = None
+        self.running = True
+        self.probe.connect(self.answer, Qt.ConnectionType.QueuedConnection)
+        self.thread = threading.Thread(target=self.watch, name='watchdog', daemon=True)
+        self.thread.start()
+
+    # Helper thread: keep one probe in flight; if it is overdue, grab the GUI thread's stack now,
+    # while whatever blocks the loop is still on it
+    def watch(self):
+        while self.running:
+            time.sleep(PROBE_INTERVAL)
+            now = time.perf_counter()
+            with self.lock:
+                if self.posted_at is None:
+                    self.posted_at = now
+                    post = True
+                else:
+                    post = False
+                    if self.stack is None and now - self.posted_at > self.threshold:
+                        frame = sys._current_frames().get(self.gui_thread)
+                        self.stack = traceback.format_stack(frame) if frame is not None else []
+            if post:
+                self.probe.emit(now)
+
+    # GUI thread: the probe got through; its delay is the event-loop lag
+    def answer(self, posted_at):
+        now = time.perf_counter()
+        with self.lock:
+            stack, self.stack = self.stack, None
+            self.posted_at = None
+        lag = now - posted_at
+        self.add_event('loop lag', 'watchdog', posted_at, lag)
+        if lag > self.threshold:
+            stall = {'start_ms': (posted_at - self.origin) * 1000, 'lag_ms': lag * 1000, 'stack': stack or []}
+            with self.lock:
+                self.stalls.append(stall)
+            self.add_event('stall', 'stall', posted_at, lag, {'stack': ''.join(stack or [])})
+
+    def add_event(self, name, category, start, duration, args=None, thread=None):
+        event = {'name': name, 'cat': category, 'ph': 'X', 'pid': self.pid,
+                 'tid': thread if thread is not None else self.gui_thread,
+                 'ts': (start - self.origin) * 1e6, 'dur': duration * 1e6}
+        if args:
+            event['args'] = args
+        # Hotkey and hook threads add events too, so the deque is only touched under the lock
+        with self.lock:
+            self.events.append(event)
+
+    # Replace cls.name with a wrapper that records each call as a trace event. Patching the class
+    # rather than instances keeps Qt virtual overrides such as paintEvent working.
+    def instrument(self, cls, name, category):
+        original = getattr(cls, name)
+        label = f"{cls.__name__}.{name}"
+
+        @functools.wraps(original)
+        def traced(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.add_event(label, category, start, time.perf_counter() - start, thread=threading.get_ident())
+        setattr(cls, name, traced)
+
+    # Write a Chrome trace-event file (chrome://tracing or Perfetto) with the stalls alongside
+    def export(self, path):
+        with self.lock:
+            events = list(self.events)
+            stalls = list(self.stalls)
+        write_atomic(path, json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms', 'stalls': stalls}),
+                     prefix='.trace-')
+
+    # One-line summary for the tray tooltip
+    def summary(self):
+        if not self.stalls:
+            return "no event-loop stalls"
+        worst = max(stall['lag_ms'] for stall in self.stalls)
+        return f"{len(self.stalls)} event-loop stalls, worst {worst:.0f} ms"
+
+    def close(self):
+        self.running = False
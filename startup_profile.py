@@ -0,0 +1,28 @@
+import sys
+import time
+
+class StartupProfile:
+    # Record named startup phases against a common origin when enabled
+    def __init__(self, enabled, origin=None):
+        self.enabled = enabled
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.marks = []
+
+    # Close the phase that ends now
+    def mark(self, phase):
+        if self.enabled:
+            self.marks.append((phase, time.perf_counter()))
+
+    def has(self, phase):
+        return any(name == phase for name, _ in self.marks)
+
+    # Print each phase's own duration and the time since the origin, in the order the phases ended
+    def report(self, stream=sys.stderr):
+        if not self.enabled:
+            return
+        previous = self.origin
+        print(f"{'phase':<20} {'duration':>10} {'total':>10}", file=stream)
+        for phase, moment in sorted(self.marks, key=lambda mark: mark[1]):
+            print(f"{phase:<20} {(moment - previous) * 1000:>8.1f}ms {(moment - self.origin) * 1000:>8.1f}ms", file=stream)
+            previous = moment
+        stream.flush()
@@ -0,0 +1,280 @@
+import bisect
+import math
+import time
+from splits import format_delta
+
+# Pure-Python timing core shared by the overlay and the headless mode; nothing here may import Qt
+
+# Name of the timer configured by the top-level config keys
+MAIN_TIMER = 'main'
+
+# Timer modes
+STOPWATCH = 'stopwatch'
+COUNTDOWN = 'countdown'
+
+# Display resolutions: tick interval in milliseconds and digits shown after the seconds
+RESOLUTIONS = {
+    'seconds': (1000, 0),
+    'tenths': (100, 1),
+    'milliseconds': (16, 3),
+}
+
+# Fraction of a display step an update may be delayed, so boundaries of timers started at different
+# moments share one wakeup
+COALESCE_FRACTION = 0.05
+
+# Format elapsed seconds as hh:mm:ss with optional fractional digits. Rounding to the nanosecond before
+# truncating keeps float noise (299.9 * 1000 == 299899.99999999997) from dropping a whole millisecond.
+def format_elapsed(elapsed, decimals=0):
+    total_ms = int(round(elapsed * 1000, 6))
+    hours, rest = divmod(total_ms, 3600000)
+    minutes, rest = divmod(rest, 60000)
+    seconds, millis = divmod(rest, 1000)
+    text = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    if decimals:
+        text += '.' + f"{millis:03d}"[:decimals]
+    return text
+
+# Expand the config into one config per timer. The main timer uses the top-level keys;
+# each entry of config['timers'] inherits them and overrides its own hotkeys, anchor and style.
+def timer_configs(config):
+    configs = {MAIN_TIMER: config}
+    for entry in config.get('timers', []):
+        name = entry.get('name')
+        if name and name not in configs:
+            configs[name] = {**config, 'mode': STOPWATCH, 'duration': 0, **entry}
+    return configs
+
+# When to wake for a set of timers (anything with `state`, `next_due` and `tick_interval`): at the earliest
+# boundary, pushed back to also cover every boundary within the coalescing window after it. None when
+# nothing runs. The window is COALESCE_FRACTION of the finest running display step, so no update is late
+# by more. Timers started together share every wakeup; timers started at different moments share those
+# within a window of each other, so there are at most 1 / window wakeups a second however many run.
+def next_wakeup(timers):
+    running = [timer for timer in timers if timer.state.running]
+    if not running:
+        return None
+    first = min(timer.next_due for timer in running)
+    window = min(timer.tick_interval for timer in running) / 1000 * COALESCE_FRACTION
+    return max(timer.next_due for timer in running if timer.next_due <= first + window)
+
+def ignore(*args):
+    pass
+
+class TimerState:
+    # Compact per-timer state; times are seconds on the scheduler's monotonic clock,
+    # except started_at, the wall-clock time the session began
+    __slots__ = ('name', 'mode', 'duration', 'start_time', 'accumulated', 'running', 'started_at')
+
+    def __init__(self, name, mode=STOPWATCH, duration=0.0):
+        self.name = name
+        self.mode = mode
+        self.duration = duration
+        self.start_time = 0.0
+        self.accumulated = 0.0
+        self.running = False
+        self.started_at = 0.0
+
+    def elapsed(self, now):
+        if self.running:
+            return self.accumulated + now - self.start_time
+        return self.accumulated
+
+    # Value to display: elapsed time for stopwatches, remaining time for countdowns
+    def value(self, now):
+        if self.mode == COUNTDOWN:
+            return max(0.0, self.duration - self.elapsed(now))
+        return self.elapsed(now)
+
+    def finished(self, now):
+        return self.mode == COUNTDOWN and self.elapsed(now) >= self.duration
+
+    def start(self, now):
+        self.start_time = now
+        self.accumulated = 0.0
+        self.running = True
+        self.started_at = time.time()
+
+    def stop(self, now):
+        if self.running:
+            self.accumulated = self.elapsed(now)
+            self.running = False
+
+    def reset(self, now):
+        self.start_time = now
+        self.accumulated = 0.0
+
+class TimerCore:
+    # Config keys the core depends on
+    TIMING_KEYS = {'resolution', 'mode', 'duration', 'thresholds'}
+
+    # One timer's clock, state, thresholds, splits and checkpointing. A view shows `text`, calls
+    # update(now) once `next_due` has passed, and receives events through the two callbacks:
+    # on_event(event, timer name, elapsed) and on_session(timer name, wall-clock start, elapsed).
+    def __init__(self, config, name=MAIN_TIMER, clock=time.monotonic, on_event=ignore, on_session=ignore):
+        self.state = TimerState(name)
+        self.clock = clock
+        self.on_event = on_event
+        self.on_session = on_session
+        self.next_due = 0.0
+        self.elapsed = 0.0
+        self.text = ''
+        # Optional Splits compared against while running; only the main timer uses them
+        self.splits = None
+        # Optional Checkpoint written on every start, stop and reset so a crash can be resumed
+        self.checkpoint = None
+        self.set_timing(config)
+        self.update()
+
+    @property
+    def running(self):
+        return self.state.running
+
+    def set_timing(self, config):
+        resolution = config.get('resolution', 'seconds')
+        self.resolution = resolution if resolution in RESOLUTIONS else 'seconds'
+        self.tick_interval, self.decimals = RESOLUTIONS[self.resolution]
+        self.state.mode = config.get('mode', STOPWATCH)
+        self.state.duration = float(config.get('duration', 0))
+        # Elapsed times that publish a threshold event, and the next one not yet crossed
+        self.thresholds = sorted(float(value) for value in config.get('thresholds', []))
+        self.threshold_index = bisect.bisect_right(self.thresholds, self.state.elapsed(self.clock()))
+
+    # Update the displayed time from the monotonic clock, so late or lost ticks never accumulate,
+    # and record when the display next changes
+    def update(self, now=None):
+        if now is None:
+            now = self.clock()
+        if self.state.running and self.state.finished(now):
+            self.end_session(now)
+        if self.state.running and self.threshold_index < len(self.thresholds):
+            self.check_thresholds(now)
+        self.elapsed = self.state.value(now)
+        text = format_elapsed(self.shown_value(), self.decimals)
+        if self.splits is not None:
+            delta = self.splits.delta(self.elapsed)
+            if delta is not None:
+                text += ' ' + format_delta(delta)
+        self.text = text
+        # Rounded like format_elapsed, so the boundary computed here is the one the display uses
+        value_ms = round(self.elapsed * 1000, 6)
+        if self.state.mode == COUNTDOWN:
+            # One step after the rounded-up value shown now
+            delay = value_ms - self.shown_value() * 1000 + self.tick_interval
+        else:
+            delay = self.tick_interval - value_ms % self.tick_interval
+        self.next_due = now + delay / 1000
+
+    # Formatting truncates, which suits elapsed time. Remaining time is rounded up to the display
+    # precision instead, so a countdown shows its full duration first, every step on the way down,
+    # and zero only once it has ended; next_due is exactly when that rounded value changes.
+    def shown_value(self):
+        if self.state.mode != COUNTDOWN:
+            return self.elapsed
+        unit = 10 ** (3 - self.decimals)
+        # Rounded to the nanosecond first, so float noise just above a boundary does not round up a whole unit
+        return math.ceil(round(self.elapsed * 1000, 6) / unit) * unit / 1000
+
+    # Thresholds are checked on display updates, so they fire on the first update at or after the crossing.
+    # A countdown counts no further than its duration, so a late final update fires no threshold past it.
+    def check_thresholds(self, now):
+        elapsed = self.state.elapsed(now)
+        if self.state.mode == COUNTDOWN:
+            elapsed = min(elapsed, self.state.duration)
+        while self.threshold_index < len(self.thresholds) and elapsed >= self.thresholds[self.threshold_index]:
+            self.on_event('threshold', self.state.name, self.thresholds[self.threshold_index])
+            self.threshold_index += 1
+
+    # The actions below return True when they changed what the view shows
+    def start(self):
+        if self.state.running:
+            return False
+        now = self.clock()
+        self.state.start(now)
+        self.threshold_index = 0
+        if self.splits is not None:
+            self.splits.start_run()
+        self.save_checkpoint(now)
+        self.on_event('start', self.state.name, 0.0)
+        self.update(now)
+        return True
+
+    def stop(self):
+        if not self.state.running:
+            return False
+        now = self.clock()
+        self.end_session(now)
+        self.update(now)
+        return True
+
+    # Zero the elapsed time, keeping the timer running if it was
+    def reset(self):
+        now = self.clock()
+        self.state.reset(now)
+        self.threshold_index = 0
+        if self.splits is not None:
+            self.splits.end_run()
+            self.splits.start_run()
+        self.save_checkpoint(now)
+        self.on_event('reset', self.state.name, 0.0)
+        self.update(now)
+        return True
+
+    # Record a split; the first split starts the run and the last one ends it
+    def split(self):
+        if not self.state.running:
+            return self.start()
+        if self.splits is None:
+            return False
+        now = self.clock()
+        elapsed = self.state.elapsed(now)
+        finished = self.splits.split(elapsed)
+        self.save_checkpoint(now)
+        self.on_event('split', self.state.name, elapsed)
+        if finished:
+            return self.stop()
+        self.update(now)
+        return True
+
+    # Thresholds crossed since the last update fire before the stop, including one at a countdown's duration
+    def end_session(self, now):
+        self.check_thresholds(now)
+        self.state.stop(now)
+        if self.splits is not None:
+            self.splits.end_run()
+        self.save_checkpoint(now)
+        self.on_event('stop', self.state.name, self.state.elapsed(now))
+        self.on_session(self.state.name, self.state.started_at, self.state.elapsed(now))
+
+    # Checkpoint state changes from now on; returns True if the timer was resumed from the checkpoint
+    def set_checkpoint(self, checkpoint):
+        self.checkpoint = checkpoint
+        now = self.clock()
+        if checkpoint is None or not checkpoint.restore(self.state, now):
+            return False
+        self.threshold_index = bisect.bisect_right(self.thresholds, self.state.elapsed(now))
+        if self.state.running and self.splits is not None:
+            times = checkpoint.restore_splits(self.state.name)
+            if times is None:
+                self.splits.start_run()
+            else:
+                self.splits.resume_run(times)
+        # A countdown that ran out while the app was down ends here
+        self.update(now)
+        return True
+
+    # A timer stopped at zero has nothing to resume, so its slot is freed for other timers
+    def save_checkpoint(self, now):
+        if self.checkpoint is None:
+            return
+        if not self.state.running and not self.state.accumulated:
+            self.checkpoint.clear(self.state.name)
+            return
+        self.checkpoint.save(self.state, now)
+        if self.splits is not None:
+            self.checkpoint.save_splits(self.state.name, self.splits.run_times())
+
+    # Compare against the given splits, or stop comparing when they have no segments
+    def set_splits(self, splits):
+        self.splits = splits if splits is not None and splits.count and self.state.mode != COUNTDOWN else None
+        self.update()
@@ -0,0 +1,82 @@
+from PySide6.QtCore import QObject, Signal
+from timer_scheduler import TimerScheduler
+from timer_core import timer_configs, MAIN_TIMER
+from timer_widget import TimerWidget
+
+class TimerPool(QObject):
+    # Forwards TimerWidget.session_finished from every timer in the pool
+    session_finished = Signal(str, float, float)
+    # Forwards TimerWidget.timer_event from every timer in the pool
+    timer_event = Signal(str, str, float)
+
+    # Own one TimerWidget per configured timer, all driven by a single shared scheduler
+    def __init__(self, config, parent=None):
+        super().__init__(parent)
+        self.scheduler = TimerScheduler(self)
+        self.widgets = {}
+        self.shown = False
+        self.checkpoint = None
+        self.update_config(config)
+
+    @property
+    def main(self):
+        return self.widgets[MAIN_TIMER]
+
+    def get(self, name):
+        return self.widgets.get(name or MAIN_TIMER)
+
+    # Add, remove and reconfigure timers to match the config
+    def update_config(self, config):
+        configs = timer_configs(config)
+        for name in [name for name in self.widgets if name not in configs]:
+            widget = self.widgets.pop(name)
+            if self.checkpoint is not None:
+                self.checkpoint.clear(name)
+            self.scheduler.remove(widget)
+            widget.zorder.close()
+            widget.close()
+            widget.deleteLater()
+        for name, timer_config in configs.items():
+            widget = self.widgets.get(name)
+            if widget:
+                widget.update_config(timer_config)
+            else:
+                widget = self.widgets[name] = TimerWidget(timer_config, self.scheduler, name)
+                widget.session_finished.connect(self.session_finished)
+                widget.timer_event.connect(self.timer_event)
+                if self.checkpoint is not None:
+                    widget.set_checkpoint(self.checkpoint)
+                if self.shown:
+                    widget.show()
+
+    # Checkpoint every timer, resuming those that were running when the app last stopped; None stops
+    # checkpointing
+    def set_checkpoint(self, checkpoint):
+        self.checkpoint = checkpoint
+        if checkpoint is not None:
+            checkpoint.retain(self.widgets)
+        for widget in self.widgets.values():
+            widget.set_checkpoint(checkpoint)
+
+    def show(self):
+        self.shown = True
+        for widget in self.widgets.values():
+            widget.show()
+            widget.update_position()
+
+    # Each action returns whether the timer changed; False for unknown timers
+    def start(self, name=None):
+        widget = self.get(name)
+        return widget is not None and widget.start_timer()
+
+    def stop(self, name=None):
+        widget = self.get(name)
+        return widget is not None and widget.stop_timer()
+
+    def split(self, name=None):
+        widget = self.get(name)
+        return widget is not None and widget.split_timer()
+
+    def reset(self, name=None):
+        widget = self.get(name)
+        return widget is not None and widget.reset_timer()
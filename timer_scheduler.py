@@ -0,0 +1,44 @@
+import math
+import time
+from PySide6.QtCore import Qt, QObject, QTimer
+from timer_core import next_wakeup
+
+class TimerScheduler(QObject):
+    # Drive every registered view from one precise timer armed for the earliest display boundary.
+    # A view provides `state`, `next_due`, `tick_interval` and `update_time(now)`. Boundaries within
+    # the coalescing window of each other are served by one wakeup; next_wakeup states the bound.
+    def __init__(self, parent=None, clock=time.monotonic):
+        super().__init__(parent)
+        self.clock = clock
+        self.views = []
+        self.wakeups = 0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+
+    def add(self, view):
+        self.views.append(view)
+
+    def remove(self, view):
+        if view in self.views:
+            self.views.remove(view)
+            self.reschedule()
+
+    # Refresh every running view whose boundary has passed, then re-arm once for all of them
+    def tick(self):
+        self.wakeups += 1
+        now = self.clock()
+        for view in self.views:
+            if view.state.running and view.next_due <= now:
+                view.update_time(now)
+        self.reschedule(now)
+
+    def reschedule(self, now=None):
+        due = next_wakeup(self.views)
+        if due is None:
+            self.timer.stop()
+            return
+        if now is None:
+            now = self.clock()
+        self.timer.start(max(0, math.ceil((due - now) * 1000)))
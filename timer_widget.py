@@ -1,21 +1,69 @@
 import ctypes
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
-from PySide6.QtCore import Qt, QTimer, QTime
-from PySide6.QtGui import QColor, QPainter, QFont
+from PySide6.QtWidgets import QWidget
+from PySide6.QtCore import Qt, QTimer, QRect, QRectF, QSize, QPoint, Signal
+from PySide6.QtGui import QColor, QPainter, QFont, QGuiApplication, QPixmap
+from config_manager import changed_keys
+from glyph_atlas import GlyphAtlas
+from zorder import ZOrderManager
+from mirror_overlay import MirrorWindow
+from timer_scheduler import TimerScheduler
+from timer_core import TimerCore, MAIN_TIMER
+
+# Anchor name -> where the widget sits in the free space of the screen, horizontally and vertically
+ANCHORS = {
+    'top_left': (0.0, 0.0),
+    'top_center': (0.5, 0.0),
+    'top_right': (1.0, 0.0),
+    'center_left': (0.0, 0.5),
+    'center': (0.5, 0.5),
+    'center_right': (1.0, 0.5),
+    'bottom_left': (0.0, 1.0),
+    'bottom_center': (0.5, 1.0),
+    'bottom_right': (1.0, 1.0),
+}
+
+# Space between the window edge and the time background, and the background's look
+MARGIN = 9
+BACKGROUND_COLOR = QColor(0, 0, 0, 100)
+BACKGROUND_RADIUS = 10
+# Background shown while an alarm flashes the overlay, and for how long
+FLASH_COLOR = QColor(255, 255, 255, 160)
+FLASH_MS = 600
 
 class TimerWidget(QWidget):
-    # Initialize widget with given config and available screens
-    def __init__(self, config, screens):
+    # Emitted when a running session ends: timer name, wall-clock start and elapsed seconds
+    session_finished = Signal(str, float, float)
+    # Emitted on start, stop, split, reset and threshold crossings: event, timer name and elapsed seconds
+    timer_event = Signal(str, str, float)
+
+    # Config keys each part of the widget depends on
+    STYLE_KEYS = {'color', 'font', 'font_size'}
+    TIMING_KEYS = TimerCore.TIMING_KEYS
+    POSITION_KEYS = {'position', 'screen_index', 'mirror_screens', 'offset_x', 'offset_y'}
+    CONFIG_KEYS = STYLE_KEYS | TIMING_KEYS | POSITION_KEYS
+
+    # Initialize widget with given config; timers sharing a scheduler share its wakeups.
+    # The timing itself lives in a TimerCore on the scheduler's clock; the widget only shows it.
+    def __init__(self, config, scheduler=None, name=MAIN_TIMER):
         super().__init__()
-        self.config = config
-        self.screens = screens
+        self.config = dict(config)
+        self.screens = QGuiApplication.screens()
+        self.position_cache = {}
+        self.watch_screens()
+        self.scheduler = scheduler or TimerScheduler(self)
+        self.core = TimerCore(self.config, name, self.scheduler.clock, self.timer_event.emit, self.session_finished.emit)
+        self.state = self.core.state
+        self.scheduler.add(self)
+        self.text = ''
+        self.atlas = None
+        # Mirror windows by screen index, and the frame they share; the frame only exists while mirroring
+        self.mirrors = {}
+        self.frame = None
+        self.background = BACKGROUND_COLOR
         self.init_ui()
-        self.setup_timer()
-        self.time = QTime(0, 0)
-        self.timer_running = False
-        self.ensure_topmost_timer = QTimer(self)
-        self.ensure_topmost_timer.timeout.connect(self.ensure_topmost)
-        self.ensure_topmost_timer.start(1000)  # Check every second
+        # Reasserts always-on-top only when another window actually covered the overlay
+        self.zorder = ZOrderManager(self)
+        self.update_mirrors()
     
     # Set up widget UI and window flags for always-on-top behavior    
     def init_ui(self):
@@ -28,83 +76,285 @@ class TimerWidget(QWidget):
         )
         self.setAttribute(Qt.WA_TranslucentBackground)
         self.setAttribute(Qt.WA_ShowWithoutActivating)
-        
-        layout = QVBoxLayout()
-        self.time_label = QLabel('00:00:00')
         self.update_label_style()
-        layout.addWidget(self.time_label, alignment=Qt.AlignmentFlag.AlignCenter)
-        
-        self.setLayout(layout)
-        
-    def setup_timer(self):
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_time)
-        self.timer.setInterval(1000)
-    
-    # Update displayed time    
-    def update_time(self):
-        self.time = self.time.addSecs(1)
-        self.time_label.setText(self.time.toString('hh:mm:ss'))
-        
+        self.update_time()
+
+    @property
+    def timer_running(self):
+        return self.state.running
+
+    # Read by the scheduler: when the display next changes
+    @property
+    def next_due(self):
+        return self.core.next_due
+
+    # Display step in milliseconds, read by the scheduler to size its coalescing window
+    @property
+    def tick_interval(self):
+        return self.core.tick_interval
+
+    @property
+    def elapsed(self):
+        return self.core.elapsed
+
+    @property
+    def splits(self):
+        return self.core.splits
+
+    # Called by the scheduler once next_due has passed
+    def update_time(self, now=None):
+        self.core.update(now)
+        self.set_display_text(self.core.text)
+
+    # Show the core's new time and re-arm the shared scheduler for it. Passes through whether the
+    # action changed anything, so callers can tell a real change from a no-op press.
+    def refresh(self, changed=True):
+        if changed:
+            self.set_display_text(self.core.text)
+            self.scheduler.reschedule()
+        return changed
+
     def start_timer(self):
-        if not self.timer_running:
-            self.time.setHMS(0, 0, 0)
-            self.timer.start()
-            self.timer_running = True
-            self.time_label.setText('00:00:00')
-        
+        return self.refresh(self.core.start())
+
     def stop_timer(self):
-        if self.timer_running:
-            self.timer.stop()
-            self.timer_running = False
-        
+        return self.refresh(self.core.stop())
+
+    # Zero the elapsed time, keeping the timer running if it was
+    def reset_timer(self):
+        return self.refresh(self.core.reset())
+
+    # Record a split; the first split starts the run and the last one ends it
+    def split_timer(self):
+        return self.refresh(self.core.split())
+
+    # Checkpoint state changes from now on, resuming the timer if the checkpoint holds it
+    def set_checkpoint(self, checkpoint):
+        if self.core.set_checkpoint(checkpoint):
+            self.refresh()
+
+    # Compare against the given splits, or stop comparing when they have no segments
+    def set_splits(self, splits):
+        self.core.set_splits(splits)
+        self.set_display_text(self.core.text)
+
+    # Apply a new config, redoing only the work that depends on changed keys
     def update_config(self, new_config):
-        self.config = new_config
-        self.update_label_style()
-        self.update_position()
+        changed = changed_keys(self.config, new_config) & self.CONFIG_KEYS
+        self.config = dict(new_config)
+        if changed & self.TIMING_KEYS:
+            self.core.set_timing(self.config)
+            self.update_time()
+            self.scheduler.reschedule()
+        if changed & self.STYLE_KEYS:
+            self.update_label_style()
+        if 'mirror_screens' in changed or 'screen_index' in changed:
+            self.update_mirrors()
+        # Style and resolution change the widget size, which moves its anchored position
+        if changed:
+            self.update_position()
         
+    # Rebuild the glyph atlas when the font, colour or pixel ratio changed
     def update_label_style(self):
         font = QFont(self.config.get('font', 'Courier'), self.config.get('font_size', 48), QFont.Weight.Bold)
-        self.time_label.setFont(font)
-        self.time_label.setStyleSheet(f"""
-            color: {self.config['color']};
-            background-color: rgba(0, 0, 0, 100);
-            border-radius: 10px;
-            padding: 0px;
-        """)
-
-    # Update widget position based on config    
+        color = self.config['color']
+        ratio = self.devicePixelRatioF()
+        if self.atlas is None or not self.atlas.matches(font, color, ratio):
+            self.atlas = GlyphAtlas(font, color, ratio)
+            self.updateGeometry()
+            self.redraw_frame()
+            self.update_all()
+
+    # Show new text, repainting only the span of cells whose glyph changed
+    def set_display_text(self, text):
+        old_text = self.text
+        self.text = text
+        if len(text) != len(old_text):
+            self.updateGeometry()
+            self.redraw_frame()
+            self.update_all()
+            if self.isVisible():
+                self.update_position()
+            return
+        changed = [i for i, (old, new) in enumerate(zip(old_text, text)) if old != new]
+        if changed:
+            self.redraw_frame(changed[0], changed[-1])
+            self.update_all(self.cell_rect(changed[0]).united(self.cell_rect(changed[-1])))
+
+    # Repaint this window and every mirror, all of them or only the given rectangle
+    def update_all(self, rect=None):
+        for window in (self, *self.mirrors.values()):
+            if rect is None:
+                window.update()
+            else:
+                window.update(rect)
+
+    # Create and close mirror windows to match the configured extra screens
+    def update_mirrors(self):
+        primary = self.config.get('screen_index', 0)
+        wanted = {index for index in self.config.get('mirror_screens', []) if index != primary}
+        for index in [index for index in self.mirrors if index not in wanted]:
+            self.mirrors.pop(index).close_window()
+        for index in wanted - self.mirrors.keys():
+            self.mirrors[index] = MirrorWindow(self)
+        if not self.mirrors:
+            self.frame = None
+        elif self.frame is None:
+            self.redraw_frame()
+        if self.isVisible():
+            self.update_position()
+
+    # Render the cells first..last into the shared frame, or all of it after a size or style change
+    def redraw_frame(self, first=None, last=None):
+        if not self.mirrors:
+            return
+        size = self.sizeHint()
+        ratio = self.atlas.device_pixel_ratio
+        if (first is None or self.frame is None or self.frame.devicePixelRatio() != ratio
+                or self.frame.size() != size * ratio):
+            self.frame = QPixmap(size * ratio)
+            self.frame.setDevicePixelRatio(ratio)
+            self.frame.fill(Qt.GlobalColor.transparent)
+            first, last = 0, len(self.text) - 1
+            area = QRect(QPoint(0, 0), size)
+        else:
+            area = self.cell_rect(first).united(self.cell_rect(last))
+        painter = QPainter(self.frame)
+        painter.setClipRect(area)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.fillRect(area, Qt.GlobalColor.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+        self.paint_cells(painter, first, last)
+        painter.end()
+
+    # Copy part of the shared frame into a window; the source rectangle is in frame device pixels
+    def blit(self, painter, rect):
+        if self.frame is None:
+            return
+        ratio = self.frame.devicePixelRatio()
+        source = QRectF(rect.x() * ratio, rect.y() * ratio, rect.width() * ratio, rect.height() * ratio)
+        painter.drawPixmap(QRectF(rect), self.frame, source)
+
+    def cell_rect(self, index):
+        return QRect(MARGIN + index * self.atlas.cell_width, MARGIN,
+                     self.atlas.cell_width, self.atlas.cell_height)
+
+    # Area covered by the time background
+    def label_rect(self):
+        return QRect(MARGIN, MARGIN, self.atlas.cell_width * len(self.text), self.atlas.cell_height)
+
+    def sizeHint(self):
+        return QSize(self.atlas.cell_width * len(self.text) + 2 * MARGIN, self.atlas.cell_height + 2 * MARGIN)
+
+    # Drop cached positions whenever screens are added, removed or resized
+    def watch_screens(self):
+        app = QGuiApplication.instance()
+        app.screenAdded.connect(self.on_screen_added)
+        app.screenRemoved.connect(self.on_screens_changed)
+        for screen in self.screens:
+            self.watch_screen(screen)
+
+    def watch_screen(self, screen):
+        screen.geometryChanged.connect(self.on_screens_changed)
+        screen.availableGeometryChanged.connect(self.on_screens_changed)
+
+    def on_screen_added(self, screen):
+        self.watch_screen(screen)
+        self.on_screens_changed()
+
+    def on_screens_changed(self, *args):
+        self.screens = QGuiApplication.screens()
+        self.position_cache.clear()
+        if self.isVisible():
+            self.update_position()
+
+    # Update widget and mirror positions based on config, computing each only once per screen, anchor and size
     def update_position(self):
-        self.adjustSize()
+        size = self.sizeHint()
         screen_index = self.config.get('screen_index', 0)
-        if screen_index < len(self.screens):
-            screen = self.screens[screen_index].availableGeometry()
-        else:
-            screen = self.screen().availableGeometry()
-        
-        position = self.config['position']
-        
-        if position == 'top_left':
-            self.move(screen.left(), screen.top())
-        elif position == 'top_right':
-            self.move(screen.right() - self.width(), screen.top())
-        elif position == 'bottom_left':
-            self.move(screen.left(), screen.bottom() - self.height())
-        elif position == 'bottom_right':
-            self.move(screen.right() - self.width(), screen.bottom() - self.height())
+        screen = self.screens[screen_index] if screen_index < len(self.screens) else self.screen()
+        self.place(self, screen, size)
+        for index, mirror in self.mirrors.items():
+            # A mirror whose screen was disconnected stays hidden until it returns
+            if index < len(self.screens) and self.isVisible():
+                self.place(mirror, self.screens[index], size)
+                mirror.show()
+            else:
+                mirror.hide()
+
+    def place(self, window, screen, size):
+        if window.size() != size:
+            window.resize(size)
+        key = (screen.name(), self.config['position'], self.config.get('offset_x', 0),
+               self.config.get('offset_y', 0), size.width(), size.height())
+        target = self.position_cache.get(key)
+        if target is None:
+            target = self.position_cache[key] = self.anchor_position(screen.availableGeometry(), size)
+        if window.pos() != target:
+            window.move(target)
+
+    # Resolve the configured anchor and pixel offsets within the screen's available area
+    def anchor_position(self, area, size):
+        horizontal, vertical = ANCHORS.get(self.config['position'], ANCHORS['top_right'])
+        x = area.left() + round((area.width() - size.width()) * horizontal)
+        y = area.top() + round((area.height() - size.height()) * vertical)
+        return QPoint(x + self.config.get('offset_x', 0), y + self.config.get('offset_y', 0))
         
+    # Paint the background and the glyph cells that intersect the update rectangle,
+    # or blit them from the shared frame while mirroring
     def paintEvent(self, event):
+        if self.atlas.device_pixel_ratio != self.devicePixelRatioF():
+            self.update_label_style()
         painter = QPainter(self)
+        if self.frame is not None:
+            self.blit(painter, event.rect())
+        else:
+            area = event.rect()
+            cell_width = self.atlas.cell_width
+            first = max(0, (area.left() - MARGIN) // cell_width)
+            last = min(len(self.text) - 1, (area.right() - MARGIN) // cell_width)
+            self.paint_cells(painter, first, last)
+        painter.end()
+
+    # Draw the background and the glyph cells first..last; the caller clips to the area it repaints
+    def paint_cells(self, painter, first, last):
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.setBrush(QColor(0, 0, 0, 0))
+        painter.setBrush(self.background)
         painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawRect(self.rect())
-        super().paintEvent(event)
+        painter.drawRoundedRect(self.label_rect(), BACKGROUND_RADIUS, BACKGROUND_RADIUS)
+        cell_width = self.atlas.cell_width
+        for index in range(first, last + 1):
+            self.atlas.draw(painter, MARGIN + index * cell_width, MARGIN, self.text[index])
+
+    # Light up the background briefly to announce an alarm
+    def flash(self):
+        self.set_background(FLASH_COLOR)
+        QTimer.singleShot(FLASH_MS, self.end_flash)
+
+    def end_flash(self):
+        self.set_background(BACKGROUND_COLOR)
+
+    def set_background(self, color):
+        self.background = color
+        self.redraw_frame()
+        self.update_all()
 
     def showEvent(self, event):
         super().showEvent(event)
         QTimer.singleShot(0, self.update_position)
 
+    def hideEvent(self, event):
+        for mirror in self.mirrors.values():
+            mirror.hide()
+        super().hideEvent(event)
+
+    def closeEvent(self, event):
+        for mirror in self.mirrors.values():
+            mirror.close_window()
+        self.mirrors = {}
+        self.frame = None
+        super().closeEvent(event)
+
     def nativeEvent(self, eventType, message):
         if eventType == "windows_generic_MSG":
             msg = ctypes.wintypes.MSG.from_address(message.__int__())
@@ -113,19 +363,3 @@ class TimerWidget(QWidget):
                     ctypes.windll.user32.ShowWindow(msg.hWnd, 1)  # SW_SHOWNORMAL
                     return True, 0
         return super().nativeEvent(eventType, message)
-    
-    # Ensure widget stays on top using Windows API
-    def ensure_topmost(self):
-        # Use Windows API to set the window as topmost
-        if hasattr(ctypes.windll.user32, 'SetWindowPos'):
-            HWND_TOPMOST = -1
-            SWP_NOMOVE = 0x0002
-            SWP_NOSIZE = 0x0001
-            ctypes.windll.user32.SetWindowPos(
-                int(self.winId()),
-                HWND_TOPMOST,
-                0, 0, 0, 0,
-                SWP_NOMOVE | SWP_NOSIZE
-            )
-        self.raise_()
-        self.update_position()
\ No newline at end of file
@@ -1,5 +1,11 @@
 import os
+import stat
 import sys
+import tempfile
+import threading
+
+# Seconds DebouncedWriter waits for further saves before writing
+SAVE_DELAY = 0.5
 
 # Resolves resource paths for both development and bundled environments
 def resource_path(relative_path):
@@ -7,4 +13,67 @@ def resource_path(relative_path):
         base_path = sys._MEIPASS
     except Exception:
         base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
\ No newline at end of file
+    return os.path.join(base_path, relative_path)
+
+# Permission bits for a file replacing `path`: those of the file it replaces, or the usual default for a
+# new file under the current umask. mkstemp creates files readable by their owner only.
+def replacement_mode(path):
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+# Write to a temporary file in the same folder and rename it over the target,
+# so a crash leaves either the old or the new file, never a partial one. Without `sync`
+# readers still never see a partial file, but a power loss may lose the new contents.
+def write_atomic(path, data, prefix='.tmp-', sync=True):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=prefix, suffix='.tmp', dir=directory)
+    try:
+        os.chmod(temp_path, replacement_mode(path))
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+class DebouncedWriter:
+    # Hand text to `write` on a timer thread once no further save arrived for `delay` seconds,
+    # so rapid changes cost one write and the caller's thread never waits on the disk
+    def __init__(self, write, delay=SAVE_DELAY):
+        self.write = write
+        self.delay = delay
+        self.pending = None
+        self.save_timer = None
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+
+    # Schedule the text to be written; saves within the delay are coalesced into the last one
+    def save(self, data):
+        with self.lock:
+            self.pending = data
+            if self.save_timer:
+                self.save_timer.cancel()
+            self.save_timer = threading.Timer(self.delay, self.flush)
+            self.save_timer.daemon = True
+            self.save_timer.start()
+
+    # Write any pending save now
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                data, self.pending = self.pending, None
+                if self.save_timer:
+                    self.save_timer.cancel()
+                    self.save_timer = None
+            if data is not None:
+                self.write(data)
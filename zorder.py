@@ -0,0 +1,396 @@
+import ctypes
+import ctypes.util
+import sys
+import time
+from PySide6.QtCore import Qt, QObject, QEvent, QTimer, QSocketNotifier
+from PySide6.QtGui import QGuiApplication
+
+# Milliseconds between safety checks when no stacking notification arrives
+FALLBACK_INTERVAL = 30000
+# Milliseconds after the group raised an overlay during which further checks are put off. A raise changes
+# the stacking and so notifies the group again; without the pause two windows that both insist on being
+# on top would be raised in turn as fast as the event loop runs.
+RAISE_SETTLE = 250
+
+# Widget events that may mean another window was stacked above the overlay
+WATCHED_EVENTS = (
+    QEvent.Type.Show,
+    QEvent.Type.WindowDeactivate,
+    QEvent.Type.ActivationChange,
+    QEvent.Type.ZOrderChange,
+    QEvent.Type.WindowStateChange,
+)
+
+# Return True if two (left, top, right, bottom) rectangles overlap
+def rects_overlap(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+class NullBackend:
+    # Backend for platforms without native z-order control; tests drive it with lose()
+    def __init__(self):
+        self.topmost = True
+        self.callback = None
+
+    def watch(self, callback):
+        self.callback = callback
+
+    def begin_check(self):
+        pass
+
+    def is_topmost(self, window_id, own_ids=()):
+        return self.topmost
+
+    def raise_window(self, window_id):
+        self.topmost = True
+
+    # Simulate another window covering the overlay
+    def lose(self):
+        self.topmost = False
+        if self.callback:
+            self.callback()
+
+    def close(self):
+        self.callback = None
+
+class Win32Backend:
+    HWND_TOPMOST = -1
+    SWP_NOSIZE = 0x0001
+    SWP_NOMOVE = 0x0002
+    SWP_NOACTIVATE = 0x0010
+    GWL_EXSTYLE = -20
+    WS_EX_TOPMOST = 0x0008
+    GW_HWNDPREV = 3
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    # Windows above the overlay to inspect before giving up
+    MAX_WINDOWS_ABOVE = 64
+
+    def __init__(self):
+        import ctypes.wintypes
+        self.wintypes = ctypes.wintypes
+        self.user32 = ctypes.windll.user32
+        self.user32.GetWindow.restype = ctypes.wintypes.HWND
+        self.user32.GetWindow.argtypes = (ctypes.wintypes.HWND, ctypes.c_uint)
+        self.hook = None
+        self.hook_proc = None
+
+    # Get notified whenever any application brings a window to the foreground
+    def watch(self, callback):
+        WinEventProc = ctypes.WINFUNCTYPE(None, ctypes.wintypes.HANDLE, ctypes.wintypes.DWORD,
+                                          ctypes.wintypes.HWND, ctypes.wintypes.LONG, ctypes.wintypes.LONG,
+                                          ctypes.wintypes.DWORD, ctypes.wintypes.DWORD)
+        self.hook_proc = WinEventProc(lambda *args: callback())
+        self.hook = self.user32.SetWinEventHook(self.EVENT_SYSTEM_FOREGROUND, self.EVENT_SYSTEM_FOREGROUND,
+                                                0, self.hook_proc, 0, 0, self.WINEVENT_OUTOFCONTEXT)
+
+    # Windows are inspected live, so there is nothing to reuse between overlays
+    def begin_check(self):
+        pass
+
+    def window_rect(self, hwnd):
+        rect = self.wintypes.RECT()
+        self.user32.GetWindowRect(hwnd, ctypes.byref(rect))
+        return rect.left, rect.top, rect.right, rect.bottom
+
+    # Topmost means the topmost style is set and no visible window above overlaps us; the group's own
+    # overlays (own_ids) never count as covering each other
+    def is_topmost(self, window_id, own_ids=()):
+        if not self.user32.GetWindowLongW(window_id, self.GWL_EXSTYLE) & self.WS_EX_TOPMOST:
+            return False
+        own_rect = self.window_rect(window_id)
+        above = self.user32.GetWindow(window_id, self.GW_HWNDPREV)
+        for _ in range(self.MAX_WINDOWS_ABOVE):
+            if not above:
+                return True
+            if (above not in own_ids and self.user32.IsWindowVisible(above)
+                    and rects_overlap(own_rect, self.window_rect(above))):
+                return False
+            above = self.user32.GetWindow(above, self.GW_HWNDPREV)
+        return False
+
+    def raise_window(self, window_id):
+        self.user32.SetWindowPos(window_id, self.HWND_TOPMOST, 0, 0, 0, 0,
+                                 self.SWP_NOMOVE | self.SWP_NOSIZE | self.SWP_NOACTIVATE)
+
+    def close(self):
+        if self.hook:
+            self.user32.UnhookWinEvent(self.hook)
+            self.hook = None
+
+class XWindowAttributes(ctypes.Structure):
+    _fields_ = [
+        ('x', ctypes.c_int), ('y', ctypes.c_int), ('width', ctypes.c_int), ('height', ctypes.c_int),
+        ('border_width', ctypes.c_int), ('depth', ctypes.c_int), ('visual', ctypes.c_void_p),
+        ('root', ctypes.c_ulong), ('c_class', ctypes.c_int), ('bit_gravity', ctypes.c_int),
+        ('win_gravity', ctypes.c_int), ('backing_store', ctypes.c_int), ('backing_planes', ctypes.c_ulong),
+        ('backing_pixel', ctypes.c_ulong), ('save_under', ctypes.c_int), ('colormap', ctypes.c_ulong),
+        ('map_installed', ctypes.c_int), ('map_state', ctypes.c_int), ('all_event_masks', ctypes.c_long),
+        ('your_event_mask', ctypes.c_long), ('do_not_propagate_mask', ctypes.c_long),
+        ('override_redirect', ctypes.c_int), ('screen', ctypes.c_void_p),
+    ]
+
+class XPropertyEvent(ctypes.Structure):
+    _fields_ = [
+        ('type', ctypes.c_int), ('serial', ctypes.c_ulong), ('send_event', ctypes.c_int),
+        ('display', ctypes.c_void_p), ('window', ctypes.c_ulong), ('atom', ctypes.c_ulong),
+        ('time', ctypes.c_ulong), ('state', ctypes.c_int),
+    ]
+
+class XEvent(ctypes.Union):
+    _fields_ = [('type', ctypes.c_int), ('xproperty', XPropertyEvent), ('pad', ctypes.c_long * 24)]
+
+class X11Backend:
+    IS_VIEWABLE = 2
+    PROPERTY_NOTIFY = 28
+    PROPERTY_CHANGE_MASK = 1 << 22
+    # Root window properties the window manager updates when stacking changes
+    STACKING_ATOMS = (b'_NET_ACTIVE_WINDOW', b'_NET_CLIENT_LIST_STACKING')
+
+    # Open a private X connection; raises OSError when libX11 or a display is unavailable
+    def __init__(self):
+        path = ctypes.util.find_library('X11')
+        if not path:
+            raise OSError("libX11 not found")
+        self.xlib = ctypes.cdll.LoadLibrary(path)
+        self.xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self.xlib.XOpenDisplay.argtypes = (ctypes.c_char_p,)
+        self.xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        self.xlib.XDefaultRootWindow.argtypes = (ctypes.c_void_p,)
+        self.xlib.XQueryTree.argtypes = (ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong),
+                                         ctypes.POINTER(ctypes.c_ulong),
+                                         ctypes.POINTER(ctypes.POINTER(ctypes.c_ulong)),
+                                         ctypes.POINTER(ctypes.c_uint))
+        self.xlib.XGetWindowAttributes.argtypes = (ctypes.c_void_p, ctypes.c_ulong,
+                                                   ctypes.POINTER(XWindowAttributes))
+        self.xlib.XRaiseWindow.argtypes = (ctypes.c_void_p, ctypes.c_ulong)
+        self.xlib.XSelectInput.argtypes = (ctypes.c_void_p, ctypes.c_ulong, ctypes.c_long)
+        self.xlib.XInternAtom.restype = ctypes.c_ulong
+        self.xlib.XInternAtom.argtypes = (ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int)
+        self.xlib.XFlush.argtypes = (ctypes.c_void_p,)
+        self.xlib.XPending.argtypes = (ctypes.c_void_p,)
+        self.xlib.XNextEvent.argtypes = (ctypes.c_void_p, ctypes.POINTER(XEvent))
+        self.xlib.XConnectionNumber.argtypes = (ctypes.c_void_p,)
+        self.xlib.XFree.argtypes = (ctypes.c_void_p,)
+        self.xlib.XCloseDisplay.argtypes = (ctypes.c_void_p,)
+
+        self.display = self.xlib.XOpenDisplay(None)
+        if not self.display:
+            raise OSError("cannot open X display")
+        self.root = self.xlib.XDefaultRootWindow(self.display)
+        self.notifier = None
+        self.event = XEvent()
+        # Root children from the last tree walk, reused by every overlay checked in the same round
+        self.stacked = None
+        # Frames of the group's overlays, looked up once per round
+        self.own_frames = None
+
+    # Watch root window property changes on the connection's socket, without a thread
+    def watch(self, callback):
+        atoms = {self.xlib.XInternAtom(self.display, name, False) for name in self.STACKING_ATOMS}
+        self.xlib.XSelectInput(self.display, self.root, self.PROPERTY_CHANGE_MASK)
+        self.xlib.XFlush(self.display)
+
+        def on_readable():
+            notify = False
+            while self.xlib.XPending(self.display):
+                self.xlib.XNextEvent(self.display, ctypes.byref(self.event))
+                if self.event.type == self.PROPERTY_NOTIFY and self.event.xproperty.atom in atoms:
+                    notify = True
+            if notify:
+                callback()
+
+        self.notifier = QSocketNotifier(self.xlib.XConnectionNumber(self.display), QSocketNotifier.Type.Read)
+        self.notifier.activated.connect(on_readable)
+
+    def query_tree(self, window):
+        root, parent = ctypes.c_ulong(), ctypes.c_ulong()
+        children, count = ctypes.POINTER(ctypes.c_ulong)(), ctypes.c_uint()
+        if not self.xlib.XQueryTree(self.display, window, ctypes.byref(root), ctypes.byref(parent),
+                                    ctypes.byref(children), ctypes.byref(count)):
+            return parent.value, []
+        stacked = children[:count.value]
+        if children:
+            self.xlib.XFree(ctypes.cast(children, ctypes.c_void_p))
+        return parent.value, stacked
+
+    # The window manager reparents the overlay; find its frame directly under the root
+    def frame_of(self, window):
+        parent, _ = self.query_tree(window)
+        while parent and parent != self.root:
+            window = parent
+            parent, _ = self.query_tree(window)
+        return window
+
+    def viewable_rect(self, window):
+        attributes = XWindowAttributes()
+        if not self.xlib.XGetWindowAttributes(self.display, window, ctypes.byref(attributes)):
+            return None
+        if attributes.map_state != self.IS_VIEWABLE:
+            return None
+        return attributes.x, attributes.y, attributes.x + attributes.width, attributes.y + attributes.height
+
+    # Root children are listed bottom to top; look for viewable windows above ours that overlap it,
+    # other than the frames of the group's own overlays (own_ids)
+    def is_topmost(self, window_id, own_ids=()):
+        frame = self.frame_of(window_id)
+        own_rect = self.viewable_rect(frame)
+        if own_rect is None:
+            return True
+        if self.stacked is None:
+            _, self.stacked = self.query_tree(self.root)
+        if self.own_frames is None:
+            self.own_frames = {self.frame_of(own_id) for own_id in own_ids}
+        for window in reversed(self.stacked):
+            if window == frame:
+                return True
+            if window in self.own_frames:
+                continue
+            rect = self.viewable_rect(window)
+            if rect is not None and rects_overlap(own_rect, rect):
+                return False
+        return True
+
+    # Walk the root tree again on the next check
+    def begin_check(self):
+        self.stacked = None
+        self.own_frames = None
+
+    def raise_window(self, window_id):
+        self.xlib.XRaiseWindow(self.display, self.frame_of(window_id))
+        self.xlib.XFlush(self.display)
+        self.stacked = None
+
+    def close(self):
+        if self.notifier:
+            self.notifier.setEnabled(False)
+            self.notifier = None
+        if self.display:
+            self.xlib.XCloseDisplay(self.display)
+            self.display = None
+
+# Pick the backend for the running platform, falling back to the no-op backend
+def select_backend():
+    if sys.platform == 'win32':
+        return Win32Backend()
+    if QGuiApplication.platformName() == 'xcb':
+        try:
+            return X11Backend()
+        except OSError:
+            pass
+    return NullBackend()
+
+class ZOrderGroup(QObject):
+    # One backend, one native watch and one coalesced check shared by every overlay on screen
+    def __init__(self, backend, fallback_interval=FALLBACK_INTERVAL):
+        app = QGuiApplication.instance()
+        super().__init__(app)
+        self.backend = backend
+        self.managers = []
+        # Monotonic time until which checks wait for the stacking to settle after our own raise
+        self.settle_until = 0.0
+
+        # Zero-interval single shot coalesces bursts of notifications into one check of all overlays
+        self.check_timer = QTimer(self)
+        self.check_timer.setSingleShot(True)
+        self.check_timer.setInterval(0)
+        self.check_timer.timeout.connect(self.check)
+
+        self.fallback_timer = QTimer(self)
+        self.fallback_timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
+        self.fallback_timer.timeout.connect(self.check)
+        if fallback_interval:
+            self.fallback_timer.start(fallback_interval)
+
+        app.focusWindowChanged.connect(self.schedule_check)
+        app.applicationStateChanged.connect(self.schedule_check)
+        self.backend.watch(self.schedule_check)
+
+    def add(self, manager):
+        self.managers.append(manager)
+
+    # The group closes its backend once its last overlay is gone
+    def remove(self, manager):
+        if manager in self.managers:
+            self.managers.remove(manager)
+            if not self.managers:
+                self.close()
+
+    def schedule_check(self, *args):
+        if not self.check_timer.isActive():
+            delay = self.settle_until - time.monotonic()
+            self.check_timer.start(max(0, int(delay * 1000)))
+
+    # The backend may reuse what it learned about the stacking for every overlay in this round
+    def check(self):
+        self.backend.begin_check()
+        own_ids = {manager.window_id() for manager in self.managers if manager.widget.isVisible()}
+        raised = False
+        for manager in list(self.managers):
+            raised = manager.check(own_ids) or raised
+        if raised:
+            self.settle_until = time.monotonic() + RAISE_SETTLE / 1000
+
+    # Checks and re-asserts of every overlay in the group so far
+    def stats(self):
+        return (sum(manager.check_count for manager in self.managers),
+                sum(manager.reassert_count for manager in self.managers))
+
+    def close(self):
+        global shared
+        self.fallback_timer.stop()
+        self.check_timer.stop()
+        self.backend.close()
+        if shared is self:
+            shared = None
+
+# The group overlays join unless they bring their own backend
+shared = None
+
+def shared_group(fallback_interval=FALLBACK_INTERVAL):
+    global shared
+    if shared is None:
+        shared = ZOrderGroup(select_backend(), fallback_interval)
+    return shared
+
+class ZOrderManager(QObject):
+    # Keep a widget on top, reasserting only after the backend reports it was covered
+    def __init__(self, widget, backend=None, fallback_interval=FALLBACK_INTERVAL):
+        super().__init__(widget)
+        self.widget = widget
+        self.group = shared_group(fallback_interval) if backend is None else ZOrderGroup(backend, fallback_interval)
+        self.backend = self.group.backend
+        self.check_count = 0
+        self.reassert_count = 0
+
+        widget.installEventFilter(self)
+        self.group.add(self)
+        # A widget deleted without close() must not stay in the group
+        widget.destroyed.connect(self.close)
+
+    def eventFilter(self, obj, event):
+        if event.type() in WATCHED_EVENTS:
+            self.schedule_check()
+        return False
+
+    def schedule_check(self, *args):
+        self.group.schedule_check()
+
+    def window_id(self):
+        return int(self.widget.winId())
+
+    # Ask the backend whether we are still on top and restore it only if we are not; returns True
+    # when it raised the widget
+    def check(self, own_ids=()):
+        if not self.widget.isVisible():
+            return False
+        self.check_count += 1
+        window_id = self.window_id()
+        if self.backend.is_topmost(window_id, own_ids):
+            return False
+        self.backend.raise_window(window_id)
+        self.widget.raise_()
+        self.reassert_count += 1
+        return True
+
+    def close(self):
+        self.group.remove(self)